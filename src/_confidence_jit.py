@@ -0,0 +1,71 @@
+# src/_confidence_jit.py
+"""
+Agrégation numérique du score de confiance.
+Les réductions sur les articles (sentiment net, somme des qualités, alerte
+max) sont compilées avec Numba si disponible (cache disque : la compilation
+n'est payée qu'au premier run) ; sans Numba, réductions numpy / sum().
+Les qualités sont sommées dans l'ordre des articles, comme sum() : la
+sommation par paires de numpy décale parfois la 3e décimale.
+"""
+try:
+    from numba import njit
+except ImportError:  # numba absent -> réductions numpy
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _reduce(sent, qual, alert):
+        net_sent = 0
+        qual_sum = 0.0
+        max_alert = 0.0
+        for i in range(sent.shape[0]):
+            net_sent += sent[i]
+            qual_sum += qual[i]
+            if alert[i] > max_alert:
+                max_alert = alert[i]
+        return net_sent, qual_sum, max_alert
+else:
+    def _reduce(sent, qual, alert):
+        return sent.sum(), sum(qual.tolist()), alert.max()
+
+
+def compute_confidence(sent, qual, alert, sent_consistency, final_macro) -> float:
+    """
+    sent  : int8    (+1 / -1 / 0 par article)
+    qual  : float64 (qualité de source, 0.4..1.0)
+    alert : float64 (poids d'alerte : 1.0 critical, 0.6 watch, 0 sinon)
+    Retourne la confiance entre 0 et 1 (non arrondie).
+    """
+    n = len(sent)
+    if n == 0:
+        return 0.0
+
+    net_sent, qual_sum, max_alert = _reduce(sent, qual, alert)
+    net_sent = int(net_sent)
+    source_quality = float(qual_sum) / n
+    max_alert = float(max_alert)
+
+    n_news_score = min(n / 10.0, 1.0)  # 10 news ou plus -> 1.0
+
+    if final_macro == 0 or net_sent == 0:
+        macro_align = 0.5  # neutre / pas clair
+    elif final_macro * net_sent > 0:
+        macro_align = 1.0  # même sens
+    else:
+        macro_align = 0.0  # macro en sens inverse
+
+    # Pondération (Option C — balanced)
+    confidence = (
+        0.25 * n_news_score +
+        0.25 * sent_consistency +
+        0.20 * source_quality +
+        0.15 * max_alert +
+        0.15 * macro_align
+    )
+
+    if confidence < 0:
+        confidence = 0.0
+    if confidence > 1:
+        confidence = 1.0
+    return confidence
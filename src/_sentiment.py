@@ -0,0 +1,17 @@
+# src/_sentiment.py
+"""
+Table sentiment -> score (+1 / -1 / 0), toutes casses comprises,
+pour éviter un .lower() par article.
+"""
+from itertools import product
+
+
+def _case_variants(word: str):
+    return {"".join(chars) for chars in product(*((c.lower(), c.upper()) for c in word))}
+
+
+SENT_MAP = {
+    variant: score
+    for word, score in (("bullish", 1), ("bearish", -1), ("neutral", 0))
+    for variant in _case_variants(word)
+}
@@ -0,0 +1,76 @@
+# src/_url_cache.py
+"""
+Classifieurs d'URL partagés par price_impact, scoring_macro et reports.
+Fonctions pures de (event_type, url) déjà en minuscules : mémoïsées,
+chaque URL n'est analysée qu'une fois pour tout le process.
+"""
+from functools import lru_cache
+
+from src.utils import build_matcher, first_match
+
+
+# Tiers de sources par mots-clés d'URL (le plus haut tier gagne)
+_QUALITY_MATCHER = build_matcher([
+    (1.0, [  # top tier institutionnel
+        "usda.gov", "fao.org", "igc.int", "ers.usda",
+        "ec.europa.eu", "conab.gov.br", "noaa.gov", "ecmwf.int",
+        "droughtmonitor.unl.edu", "climate.gov"
+    ]),
+    (0.7, [  # bon niveau régional / pro
+        ".gov", ".gouv", ".gov.br", "agmanager.info",
+        "kswheat.com", "kansasagconnection", "agroinformacion",
+        "bolsadecereales", "news.agrofy.com.ar"
+    ]),
+])
+
+# Mots-clés d'URL par thème, dans l'ordre de priorité :
+# weather > fx > energy > shipping
+_THEME_KEYWORDS = [
+    ("weather", ["noaa", "droughtmonitor", "ecmwf", "climate.gov"]),
+    ("fx", ["currencies/usd", "dollar-index", "usd-brl", "usd-ars"]),
+    ("energy", ["brent-oil", "eia.gov", "energy"]),
+    ("shipping", ["splash247", "blackseagrain", "baltic"]),
+]
+
+
+# event_type suffisant pour conclure, sans regarder l'URL.
+# ("logistics" n'y est pas : un mot-clé d'URL fx / energy passe avant lui)
+ET_DIRECT = {"weather": "weather"}
+
+
+@lru_cache(maxsize=8192)
+def source_quality_url(url: str) -> float:
+    """
+    Score entre 0.4 et 1.0 selon la "qualité" supposée de la source.
+    `url` doit être en minuscules.
+    """
+    tier = first_match(_QUALITY_MATCHER, url)
+    if tier is not None:
+        return tier
+
+    if url:
+        return 0.5  # source générique
+    return 0.4      # pas d'URL -> on met un min
+
+
+def make_theme_classifier(groups):
+    """
+    Classifieur mémoïsé (event_type, url) -> weather / fx / energy / shipping / other
+    (les deux en minuscules), à partir des mots-clés d'URL `groups`
+    ([(thème, [mots-clés...]), ...] par priorité décroissante).
+    Les event_type de ET_DIRECT sont à traiter par l'appelant, avant l'URL.
+    """
+    matcher = build_matcher(groups)
+
+    @lru_cache(maxsize=8192)
+    def classify(et: str, url: str) -> str:
+        # un mot-clé d'URL fx / energy passe avant event_type == "logistics"
+        theme = first_match(matcher, url)
+        if theme is None and et == "logistics":
+            return "shipping"
+        return theme or "other"
+
+    return classify
+
+
+classify_theme = make_theme_classifier(_THEME_KEYWORDS)
@@ -1,6 +1,12 @@
 # src/alerts.py
 from __future__ import annotations
-from typing import Dict, Any
+from bisect import bisect_right
+from typing import Dict, Any, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick absent -> boucle simple sur les mots-clés
+    ahocorasick = None
 
 
 # Mots-clés de risque (multi-langues), avec un poids de gravité
@@ -34,62 +40,138 @@ RISK_KEYWORDS: Dict[str, int] = {
     "pérte de rendimiento": 3, "perda de rendimento": 3,
 }
 
+# Vue figée de RISK_KEYWORDS : (mot-clé en minuscules, poids), les plus longs d'abord
+_RISK_ITEMS = tuple(
+    sorted(((kw.lower(), w) for kw, w in RISK_KEYWORDS.items()), key=lambda x: -len(x[0]))
+)
 
-def compute_alert(article: Dict[str, Any]) -> Dict[str, Any]:
+
+def _build_automaton():
     """
-    Ajoute :
-      - alert_score (int)
-      - alert_severity: "none" | "info" | "watch" | "critical"
-      - alert_tags: liste de mots-clés déclencheurs (string join)
-    en se basant sur :
-      - mots-clés de risque dans title / summary / text
-      - event_type (weather / logistics / politics / trade)
-      - sentiment (bullish/bearish => mouvement de prix)
-      - source_group (geopolitics / shipping / macro / grains)
+    Index Aho-Corasick dérivé de RISK_KEYWORDS (le dict reste la référence).
+    Un seul passage sur le texte au lieu d'un `kw in full` par mot-clé.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw, w in _RISK_ITEMS:
+        automaton.add_word(kw, (kw, w))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+
+def _match_risk_keywords(full: str) -> List[Tuple[str, int]]:
     """
+    Retourne les (mot-clé, poids) présents dans `full` (déjà en minuscules).
+    Chaque mot-clé n'est compté qu'une fois, comme avec `kw in full`.
+    """
+    if _AUTOMATON is None:
+        # même ordre que l'automate : fin de la première occurrence,
+        # le plus long d'abord à égalité (_RISK_ITEMS est déjà trié ainsi)
+        found = [(full.find(kw) + len(kw), kw, w) for kw, w in _RISK_ITEMS if kw in full]
+        found.sort(key=lambda x: x[0])
+        return [(kw, w) for _, kw, w in found]
+
+    return list(dict.fromkeys(hit for _, hit in _AUTOMATON.iter(full)))
+
+
+def _match_risk_keywords_batch(fulls: List[str]) -> List[List[Tuple[str, int]]]:
+    """
+    Même chose que _match_risk_keywords mais pour tout un lot de textes :
+    on concatène les textes (séparés par \x00, absent des mots-clés) et
+    l'automate ne fait qu'un seul passage sur l'ensemble.
+    """
+    if _AUTOMATON is None:
+        return [_match_risk_keywords(full) for full in fulls]
+
+    starts = []
+    offset = 0
+    for full in fulls:
+        starts.append(offset)
+        offset += len(full) + 1
+
+    hits: List[Dict[Tuple[str, int], None]] = [{} for _ in fulls]
+    for end, hit in _AUTOMATON.iter("\x00".join(fulls)):
+        hits[bisect_right(starts, end) - 1][hit] = None
+    return [list(h) for h in hits]
+
 
+def _full_text(article: Dict[str, Any]) -> str:
     title = (article.get("title") or "")
     summary = (article.get("summary") or "")
     text = (article.get("text") or "")
 
-    full = f"{title}\n{summary}\n{text}".lower()
+    return f"{title}\n{summary}\n{text}".lower()
 
-    score = 0
-    tags = []
 
+# Seuils de score -> severity (bisect sur les bornes basses)
+_SEVERITY_THRESHOLDS = (2, 4, 7)
+_SEVERITY_LABELS = ("none", "info", "watch", "critical")
+
+_ALERT_EVENTS = frozenset(("weather", "logistics", "trade", "politics", "stocks", "production"))
+_ALERT_SENTIMENTS = frozenset(("bullish", "bearish"))
+_ALERT_GROUPS = frozenset(("geopolitics", "shipping"))
+
+
+def _alert_fields(article: Dict[str, Any], keywords: List[Tuple[str, int]]) -> Tuple[int, str, str]:
+    """
+    Calcule (alert_score, alert_severity, alert_tags) sans toucher à l'article.
+    `keywords` est déjà dédoublonné, dans l'ordre d'apparition dans le texte.
+    """
     # 1) Mots-clés de risque
-    for kw, w in RISK_KEYWORDS.items():
-        if kw in full:
-            score += w
-            tags.append(kw)
+    score = sum(w for _, w in keywords)
 
     # 2) Type d'événement
-    event = (article.get("event_type") or "").lower()
-    if event in ("weather", "logistics", "trade", "politics", "stocks", "production"):
+    if (article.get("event_type") or "").lower() in _ALERT_EVENTS:
         score += 1
 
     # 3) Sentiment orienté prix
-    sentiment = (article.get("sentiment") or "").lower()
-    if sentiment in ("bullish", "bearish"):
+    if (article.get("sentiment") or "").lower() in _ALERT_SENTIMENTS:
         score += 1
 
     # 4) Groupe de source (macro/shipping/geopolitics/grains)
-    group = (article.get("source_group") or "").lower()
-    if group in ("geopolitics", "shipping"):
+    if (article.get("source_group") or "").lower() in _ALERT_GROUPS:
         score += 1
 
     # 5) Normalisation -> severity
-    if score >= 7:
-        severity = "critical"
-    elif score >= 4:
-        severity = "watch"
-    elif score >= 2:
-        severity = "info"
-    else:
-        severity = "none"
-
-    article["alert_score"] = score
-    article["alert_severity"] = severity
-    article["alert_tags"] = ",".join(sorted(set(tags)))
-
-    return article
\ No newline at end of file
+    severity = _SEVERITY_LABELS[bisect_right(_SEVERITY_THRESHOLDS, score)]
+
+    return score, severity, ",".join(kw for kw, _ in keywords)
+
+
+def _apply_alert(article: Dict[str, Any], keywords: List[Tuple[str, int]]) -> Dict[str, Any]:
+    (
+        article["alert_score"],
+        article["alert_severity"],
+        article["alert_tags"],
+    ) = _alert_fields(article, keywords)
+    return article
+
+
+def compute_alert(article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ajoute :
+      - alert_score (int)
+      - alert_severity: "none" | "info" | "watch" | "critical"
+      - alert_tags: liste de mots-clés déclencheurs (string join)
+    en se basant sur :
+      - mots-clés de risque dans title / summary / text
+      - event_type (weather / logistics / politics / trade)
+      - sentiment (bullish/bearish => mouvement de prix)
+      - source_group (geopolitics / shipping / macro / grains)
+    """
+    return _apply_alert(article, _match_risk_keywords(_full_text(article)))
+
+
+def compute_alerts_batch(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Version batch de compute_alert : les mots-clés de tout le lot sont
+    cherchés en un seul passage de l'automate.
+    """
+    fulls = [_full_text(a) for a in articles]
+    for article, keywords in zip(articles, _match_risk_keywords_batch(fulls)):
+        _apply_alert(article, keywords)
+    return articles
@@ -2,13 +2,21 @@
 
 import os
 import glob
-import json
+import hashlib
 from datetime import datetime, timedelta
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import yfinance as yf
 
+from src._sentiment import SENT_MAP
+
 DATA_DIR = "data/processed"
+CACHE_DIR = "data/cache"
 
 COMMODITY_TICKERS = {
     "wheat": "ZW=F",
@@ -19,22 +27,20 @@ COMMODITY_TICKERS = {
 FORWARD_DAYS = 5  # horizon de backtest (jours calendaires)
 
 
-def _sentiment_score(sentiment: str) -> int:
-    s = (sentiment or "").lower()
-    if s == "bullish":
-        return 1
-    if s == "bearish":
-        return -1
-    return 0
-
-
 def load_signals() -> pd.DataFrame:
     pattern = os.path.join(DATA_DIR, "signals_*.csv")
     files = sorted(glob.glob(pattern))
     if not files:
         raise FileNotFoundError(f"Aucun fichier trouvé avec le pattern {pattern}")
 
-    records = []
+    tables = []
+    parse_opts = pacsv.ParseOptions(newlines_in_values=True)  # titres multi-lignes
+    convert_opts = pacsv.ConvertOptions(
+        include_columns=["commodity", "sentiment"],
+        include_missing_columns=True,
+        column_types={"commodity": pa.string(), "sentiment": pa.string()},
+    )
+    grains = pa.array(["wheat", "corn", "soy"])
 
     for path in files:
         base = os.path.basename(path)
@@ -45,27 +51,26 @@ def load_signals() -> pd.DataFrame:
             print(f"[WARN] Date invalide dans le nom de fichier: {base}")
             continue
 
-        df = pd.read_csv(path)
-        for _, row in df.iterrows():
-            commodity = str(row.get("commodity", "other")).lower()
-            if commodity not in ("wheat", "corn", "soy"):
-                continue
-
-            sentiment = str(row.get("sentiment", "neutral"))
-            score = _sentiment_score(sentiment)
+        table = pacsv.read_csv(path, parse_options=parse_opts, convert_options=convert_opts)
 
-            records.append(
-                {
-                    "date": file_date,
-                    "commodity": commodity,
-                    "sentiment_score": score,
-                }
-            )
+        commodity = pc.utf8_lower(table["commodity"])
+        table = table.set_column(table.schema.get_field_index("commodity"), "commodity", commodity)
+        table = table.filter(pc.is_in(commodity, value_set=grains))
+        table = table.append_column(
+            "date", pa.array([file_date] * table.num_rows, type=pa.date32())
+        )
+        tables.append(table)
 
-    if not records:
+    if not tables or not sum(t.num_rows for t in tables):
         raise ValueError("Aucun signal exploitable (wheat/corn/soy) trouvé.")
 
-    df_signals = pd.DataFrame(records)
+    df_signals = pa.concat_tables(tables).to_pandas()
+    df_signals["sentiment_score"] = (
+        df_signals["sentiment"]
+        .map(SENT_MAP)
+        .fillna(0)
+        .astype(int)
+    )
 
     df_agg = (
         df_signals
@@ -76,16 +81,41 @@ def load_signals() -> pd.DataFrame:
     return df_agg
 
 
-def download_prices(start_date: datetime, end_date: datetime) -> pd.DataFrame:
-    tickers = list(COMMODITY_TICKERS.values())
+def _prices_cache_path(tickers: list[str]) -> str:
+    key = hashlib.sha1(",".join(sorted(tickers)).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f"prices_{key}.parquet")
+
+
+def _read_coverage(path: str, cached: pd.DataFrame) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Période [start, end) déjà demandée à yfinance pour ce cache
+    (fichier .json à côté du parquet). Sans ce fichier : première et
+    dernière barre en cache (la dernière sera retéléchargée).
+    """
+    try:
+        with open(path.replace(".parquet", ".json"), "rb") as f:
+            cov = orjson.loads(f.read())
+        return pd.Timestamp(cov["start"]), pd.Timestamp(cov["end"])
+    except (OSError, ValueError, KeyError):
+        return cached.index.min(), cached.index.max()
+
+
+def _write_coverage(path: str, start: pd.Timestamp, end: pd.Timestamp) -> None:
+    with open(path.replace(".parquet", ".json"), "wb") as f:
+        f.write(orjson.dumps({"start": start.isoformat(), "end": end.isoformat()}))
+
+
+def _download_close(tickers: list[str], start, end) -> pd.DataFrame:
     data = yf.download(
         tickers,
-        start=start_date - timedelta(days=7),
-        end=end_date + timedelta(days=7),
+        start=start,
+        end=end,
         interval="1d",
         auto_adjust=True,
         progress=False,
     )
+    if data.empty:
+        return pd.DataFrame(columns=tickers, index=pd.DatetimeIndex([]), dtype=float)
 
     if isinstance(data.columns, pd.MultiIndex):
         close = data["Close"].copy()
@@ -93,48 +123,135 @@ def download_prices(start_date: datetime, end_date: datetime) -> pd.DataFrame:
         close = data.copy()
 
     close = close.dropna(how="all")
-    close.index = close.index.date
+    close.index = pd.to_datetime(close.index.date)
     return close
 
 
-def attach_returns(df_signals: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
-    rows = []
-    for _, row in df_signals.iterrows():
-        date = row["date"]
-        commodity = row["commodity"]
-        score = row["sentiment_score"]
-
-        ticker = COMMODITY_TICKERS.get(commodity)
-        if ticker not in prices.columns:
-            continue
-
-        if date not in prices.index:
-            continue
-
-        date_fwd = date + timedelta(days=FORWARD_DAYS)
-        possible_dates = [d for d in prices.index if d >= date_fwd]
-        if not possible_dates:
-            continue
-        d2 = min(possible_dates)
-
-        p0 = prices.loc[date, ticker]
-        p1 = prices.loc[d2, ticker]
-        if p0 <= 0 or pd.isna(p0) or pd.isna(p1):
-            continue
+def download_prices(start_date: datetime, end_date: datetime, force_refresh: bool = False) -> pd.DataFrame:
+    """
+    Clôtures daily des futures, avec un cache parquet par jeu de tickers
+    (data/cache/prices_<hash>.parquet + .json de la période couverte) :
+    on ne télécharge que les jours demandés hors de la période déjà
+    couverte. `force_refresh=True` ignore le cache.
+    """
+    tickers = list(COMMODITY_TICKERS.values())
+    start = pd.Timestamp(start_date - timedelta(days=7)).normalize()
+    end = pd.Timestamp(end_date + timedelta(days=7)).normalize()
+    # la barre du jour peut être incomplète : couverte seulement jusqu'à hier
+    fetched_end = min(end, pd.Timestamp.now().normalize())
+    path = _prices_cache_path(tickers)
+
+    cached = None
+    if not force_refresh and os.path.exists(path):
+        try:
+            cached = pd.read_parquet(path)
+        except Exception as e:
+            print(f"[WARN] Cache prix illisible ({path}) -> {e}")
+        if cached is not None and cached.empty:
+            cached = None
+
+    if cached is None:
+        close = _download_close(tickers, start, end)
+        downloaded = not close.empty
+        # Rien téléchargé -> pas de cache (on retentera au prochain run)
+        coverage = (start, fetched_end) if downloaded else None
+    else:
+        cov_start, cov_end = _read_coverage(path, cached)
+        parts = [cached]
+        if start < cov_start:
+            parts.insert(0, _download_close(tickers, start, cov_start))
+        if cov_end < end:
+            parts.append(_download_close(tickers, cov_end, end))
+        parts = [p for p in parts if p is cached or not p.empty]
+        downloaded = len(parts) > 1
+
+        close = pd.concat(parts) if downloaded else cached
+        close = close[~close.index.duplicated(keep="last")].sort_index()
+        print(f"[BT] Prix en cache du {cov_start.date()} au {cov_end.date()} ({path})")
+
+        coverage = (min(cov_start, start), max(cov_end, fetched_end))
+        if coverage == (cov_start, cov_end):
+            coverage = None  # période inchangée
+
+    # Rien de neuf téléchargé -> on ne réécrit pas le parquet
+    if downloaded:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        close.to_parquet(path)
+    if coverage is not None:
+        _write_coverage(path, *coverage)
+
+    close = close[(close.index >= start) & (close.index < end)].copy()
+    close.index = close.index.date
+    return close
 
-        fwd_ret = (p1 / p0) - 1.0
-        r = dict(row)
-        r["ticker"] = ticker
-        r["fwd_return"] = fwd_ret
-        rows.append(r)
 
-    if not rows:
+def attach_returns(df_signals: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ajoute à chaque signal le retour forward à FORWARD_DAYS :
+      - p0 = clôture le jour du signal (date exacte requise)
+      - p1 = première clôture disponible à date + FORWARD_DAYS ou après
+    Les deux dates sont cherchées par np.searchsorted sur l'index trié des
+    prix, puis les clôtures lues directement dans le tableau NumPy.
+    """
+    out_cols = list(df_signals.columns) + ["ticker", "fwd_return"]
+
+    sig = df_signals.reset_index(drop=True)
+    sig["ticker"] = sig["commodity"].map(COMMODITY_TICKERS)
+    sig = sig[sig["ticker"].isin(prices.columns)]
+    if sig.empty or prices.empty:
         # Pas assez de data pour le moment
-        return pd.DataFrame(
-            columns=list(df_signals.columns) + ["ticker", "fwd_return"]
-        )
-
-    return pd.DataFrame(rows)
+        return pd.DataFrame(columns=out_cols)
+
+    px = prices.sort_index()
+    idx = pd.to_datetime(px.index).to_numpy().astype("datetime64[D]")
+    prices_np = px.to_numpy(dtype=float)
+    col_idx = {ticker: i for i, ticker in enumerate(px.columns)}
+    n = len(idx)
+
+    d0 = pd.to_datetime(sig["date"]).to_numpy().astype("datetime64[D]")
+    d1 = d0 + np.timedelta64(FORWARD_DAYS, "D")
+    cols = sig["ticker"].map(col_idx).to_numpy()
+
+    pos0 = np.minimum(np.searchsorted(idx, d0, side="left"), n - 1)
+    pos1 = np.searchsorted(idx, d1, side="left")
+    has_fwd = pos1 < n
+    pos1 = np.minimum(pos1, n - 1)
+
+    p0 = prices_np[pos0, cols]
+    p1 = prices_np[pos1, cols]
+
+    valid = (idx[pos0] == d0) & has_fwd & (p0 > 0) & ~np.isnan(p1)
+    if not valid.any():
+        return pd.DataFrame(columns=out_cols)
+
+    out = sig[valid].copy()
+    out["fwd_return"] = p1[valid] / p0[valid] - 1.0
+    return out[out_cols].reset_index(drop=True)
+
+
+def _bucket_stats(g: pd.DataFrame) -> dict:
+    """
+    g : index = bucket de sentiment (-1 / 0 / +1), colonnes size / sum
+    des retours forward.
+    """
+    n = int(g["size"].sum())
+
+    def _mean(bucket):
+        if bucket not in g.index:
+            return 0, None
+        return int(g.at[bucket, "size"]), float(g.at[bucket, "sum"] / g.at[bucket, "size"])
+
+    bull_n, bull_mean = _mean(1)
+    bear_n, bear_mean = _mean(-1)
+
+    return {
+        "n_signals": n,
+        "mean_fwd_return": float(g["sum"].sum() / n),
+        "bullish_n": bull_n,
+        "bearish_n": bear_n,
+        "bullish_mean": bull_mean,
+        "bearish_mean": bear_mean,
+    }
 
 
 def _summary_stats(df_bt: pd.DataFrame) -> dict:
@@ -147,45 +264,26 @@ def _summary_stats(df_bt: pd.DataFrame) -> dict:
     if df_bt.empty:
         return out
 
-    # Global
-    out["global"]["n_signals"] = int(len(df_bt))
-    out["global"]["mean_fwd_return"] = float(df_bt["fwd_return"].mean())
-
-    bull = df_bt[df_bt["sentiment_score"] > 0]
-    bear = df_bt[df_bt["sentiment_score"] < 0]
+    # Un seul groupby (commodity, signe du sentiment) ; le global et les
+    # totaux par commodity se déduisent de ce résultat.
+    bucket = np.sign(df_bt["sentiment_score"].astype(float)).astype(int).rename("bucket")
+    g = df_bt["fwd_return"].groupby([df_bt["commodity"], bucket]).agg(["size", "sum"])
 
-    out["global"]["bullish_n"] = int(len(bull))
-    out["global"]["bearish_n"] = int(len(bear))
-    out["global"]["bullish_mean"] = float(bull["fwd_return"].mean()) if len(bull) else None
-    out["global"]["bearish_mean"] = float(bear["fwd_return"].mean()) if len(bear) else None
+    out["global"] = _bucket_stats(g.groupby(level="bucket").sum())
 
-    # Par commodity
+    commodities = set(g.index.get_level_values("commodity"))
     for comm in ["wheat", "corn", "soy"]:
-        sub = df_bt[df_bt["commodity"] == comm]
-        if sub.empty:
+        if comm not in commodities:
             continue
-
-        d = {}
-        d["n_signals"] = int(len(sub))
-        d["mean_fwd_return"] = float(sub["fwd_return"].mean())
-
-        sub_bull = sub[sub["sentiment_score"] > 0]
-        sub_bear = sub[sub["sentiment_score"] < 0]
-
-        d["bullish_n"] = int(len(sub_bull))
-        d["bearish_n"] = int(len(sub_bear))
-        d["bullish_mean"] = float(sub_bull["fwd_return"].mean()) if len(sub_bull) else None
-        d["bearish_mean"] = float(sub_bear["fwd_return"].mean()) if len(sub_bear) else None
-
-        out["by_commodity"][comm] = d
+        out["by_commodity"][comm] = _bucket_stats(g.xs(comm, level="commodity"))
 
     return out
 
 
 def save_backtest_summary(summary: dict, path: str = "data/backtest_summary.json"):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"[BT] Résumé backtest écrit dans {path}")
 
 
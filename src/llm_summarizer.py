@@ -1,9 +1,21 @@
-from groq import Groq
-import json
+from groq import Groq, AsyncGroq
+import asyncio
+import hashlib
+import orjson
+import os
+import re
+import sqlite3
 
 # Le client Groq utilise la variable d'environnement GROQ_API_KEY
 client = Groq()
 
+MODEL = "llama-3.1-8b-instant"
+SYSTEM_PROMPT = "You are an expert agricultural commodity analyst focused on grains (wheat, corn, soybeans)."
+
+# Cache disque des réponses LLM (clé = sha256(modèle + prompt))
+LLM_CACHE_PATH = "data/cache/llm.sqlite"
+_cache_conn = None
+
 # Mots-clés pour filtrer le texte avant envoi au LLM
 KEYWORDS = [
 
@@ -77,6 +89,23 @@ KEYWORDS = [
 
 ]
 
+# Une seule alternation compilée (les plus longs d'abord) au lieu d'un
+# `k in p` par mot-clé
+_KW_RE = re.compile(
+    "|".join(map(re.escape, sorted({k.lower() for k in KEYWORDS}, key=len, reverse=True)))
+)
+# Mots-clés d'un seul mot : test d'appartenance direct sur les tokens du paragraphe
+_WORD_SET = frozenset(k.lower() for k in KEYWORDS if " " not in k)
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _is_relevant(p_lower: str) -> bool:
+    # chemin rapide : un token est exactement un mot-clé ;
+    # sinon la regex garde la recherche par sous-chaîne (expressions, "wheats", CJK...)
+    if not _WORD_SET.isdisjoint(_TOKEN_RE.findall(p_lower)):
+        return True
+    return _KW_RE.search(p_lower) is not None
+
 
 def _filter_relevant_text(raw: str) -> str:
     """
@@ -87,10 +116,7 @@ def _filter_relevant_text(raw: str) -> str:
         return ""
 
     paragraphs = [p.strip() for p in raw.split("\n") if p.strip()]
-    selected = []
-    for p in paragraphs:
-        if any(k.lower() in p.lower() for k in KEYWORDS):
-            selected.append(p)
+    selected = [p for p in paragraphs if _is_relevant(p.lower())]
 
     if selected:
         text = " ".join(selected)
@@ -99,6 +125,26 @@ def _filter_relevant_text(raw: str) -> str:
     return raw[:3000]
 
 
+_RULES = """Règles :
+- "commodity" :
+    - blé -> "wheat"
+    - maïs / maize -> "corn"
+    - soja -> "soy"
+    - sinon -> "other"
+- "event_type" :
+    - météo, sécheresse, pluies, gel -> "weather"
+    - stocks, inventaires, stocks-to-use -> "stocks"
+    - récolte, rendement, surfaces, production -> "production"
+    - exportations, importations, commerce, flux -> "trade"
+    - décisions gouvernementales, taxes, quotas, embargos -> "politics"
+    - ports, logistique, transport, corridor, fret -> "logistics"
+    - sinon -> "other"
+- "sentiment" = impact sur les PRIX de la céréale principale :
+    - haussier -> "bullish"
+    - baissier -> "bearish"
+    - neutre ou peu clair -> "neutral"
+"""
+
 PROMPT = """
 Tu es un analyste spécialisé en grains (blé, maïs, soja) sur un desk de trading.
 
@@ -125,76 +171,101 @@ RENVOIE UNIQUEMENT du JSON STRICT avec la structure suivante :
   "outlook": "Perspectives court terme pour les prix, 1 à 2 phrases"
 }
 
-Règles :
-- "commodity" :
-    - blé -> "wheat"
-    - maïs / maize -> "corn"
-    - soja -> "soy"
-    - sinon -> "other"
-- "event_type" :
-    - météo, sécheresse, pluies, gel -> "weather"
-    - stocks, inventaires, stocks-to-use -> "stocks"
-    - récolte, rendement, surfaces, production -> "production"
-    - exportations, importations, commerce, flux -> "trade"
-    - décisions gouvernementales, taxes, quotas, embargos -> "politics"
-    - ports, logistique, transport, corridor, fret -> "logistics"
-    - sinon -> "other"
-- "sentiment" = impact sur les PRIX de la céréale principale :
-    - haussier -> "bullish"
-    - baissier -> "bearish"
-    - neutre ou peu clair -> "neutral"
-
+""" + _RULES + """
 Réponds UNIQUEMENT avec le JSON, sans texte avant ou après.
 
 Texte :
 {TEXT}
 """
 
+# Variante multi-articles : un seul appel pour plusieurs textes
+BATCH_PROMPT = """
+Tu es un analyste spécialisé en grains (blé, maïs, soja) sur un desk de trading.
+
+Tu vas recevoir PLUSIEURS textes (news, rapports, analyses), chacun encadré
+par <<ART id=N>> et <<END>>.
+
+Pour CHAQUE texte, indépendamment des autres :
+- Identifier la céréale principalement concernée.
+- Identifier le type d'événement.
+- Évaluer l'impact sur les PRIX (haussier, baissier, neutre).
+- Produire une ANALYSE DE MARCHÉ STRUCTURÉE en FRANÇAIS :
+    - analyse principale (4 à 7 phrases),
+    - impact sur les prix (1 à 2 phrases),
+    - principaux risques (liste),
+    - perspective court terme (1 à 2 phrases).
+
+RENVOIE UNIQUEMENT un tableau JSON STRICT, avec un objet par texte
+(même "id" que dans <<ART id=N>>) :
+
+[
+  {
+    "id": 0,
+    "commodity": "wheat | corn | soy | other",
+    "event_type": "weather | stocks | production | trade | politics | logistics | other",
+    "sentiment": "bullish | bearish | neutral",
+    "analysis": "Analyse détaillée en français, 4 à 7 phrases, orientée marché",
+    "impact": "Impact sur les prix à court terme, 1 à 2 phrases",
+    "risks": ["risque 1", "risque 2"],
+    "outlook": "Perspectives court terme pour les prix, 1 à 2 phrases"
+  }
+]
+
+""" + _RULES + """
+Réponds UNIQUEMENT avec le tableau JSON, sans texte avant ou après.
+
+Textes :
+{TEXTS}
+"""
+
+
+# Tables de normalisation (construites une fois)
+_COMMODITY_ALIASES = {
+    **dict.fromkeys(("wheat", "blé", "ble"), "wheat"),
+    **dict.fromkeys(("corn", "maïs", "mais", "maize"), "corn"),
+    **dict.fromkeys(("soy", "soja", "soybean", "soybeans"), "soy"),
+}
+
+_EVENT_TYPE_MAP = {
+    "weather": "weather",
+    "stocks": "stocks",
+    "stock": "stocks",
+    "production": "production",
+    "harvest": "production",
+    "trade": "trade",
+    "commerce": "trade",
+    "politics": "politics",
+    "policy": "politics",
+    "logistics": "logistics",
+    "transport": "logistics",
+}
+
+# (event_type, indices) testés dans l'ordre si pas de correspondance exacte
+_EVENT_TYPE_HINTS = (
+    ("weather", ("drought", "rain", "pluie", "sécheresse", "gel")),
+    ("stocks", ("stock", "inventaire", "inventory")),
+    ("production", ("récolte", "harvest", "yield", "production")),
+    ("trade", ("export", "import", "trade", "commerce")),
+    ("politics", ("tax", "quota", "ban", "embargo", "policy", "gouvernement")),
+    ("logistics", ("port", "logistic", "logistique", "corridor", "freight")),
+)
+
 
 def _normalize_commodity(raw: str) -> str:
     if not raw:
         return "other"
-    t = raw.strip().lower()
-    if t in ["wheat", "blé", "ble"]:
-        return "wheat"
-    if t in ["corn", "maïs", "mais", "maize"]:
-        return "corn"
-    if t in ["soy", "soja", "soybean", "soybeans"]:
-        return "soy"
-    return "other"
+    return _COMMODITY_ALIASES.get(raw.strip().lower(), "other")
 
 
 def _normalize_event_type(raw: str) -> str:
     if not raw:
         return "other"
     t = raw.strip().lower()
-    mapping = {
-        "weather": "weather",
-        "stocks": "stocks",
-        "stock": "stocks",
-        "production": "production",
-        "harvest": "production",
-        "trade": "trade",
-        "commerce": "trade",
-        "politics": "politics",
-        "policy": "politics",
-        "logistics": "logistics",
-        "transport": "logistics",
-    }
-    if t in mapping:
-        return mapping[t]
-    if any(w in t for w in ["drought", "rain", "pluie", "sécheresse", "gel"]):
-        return "weather"
-    if any(w in t for w in ["stock", "inventaire", "inventory"]):
-        return "stocks"
-    if any(w in t for w in ["récolte", "harvest", "yield", "production"]):
-        return "production"
-    if any(w in t for w in ["export", "import", "trade", "commerce"]):
-        return "trade"
-    if any(w in t for w in ["tax", "quota", "ban", "embargo", "policy", "gouvernement"]):
-        return "politics"
-    if any(w in t for w in ["port", "logistic", "logistique", "corridor", "freight"]):
-        return "logistics"
+    if t in _EVENT_TYPE_MAP:
+        return _EVENT_TYPE_MAP[t]
+    for event_type, hints in _EVENT_TYPE_HINTS:
+        if any(w in t for w in hints):
+            return event_type
     return "other"
 
 
@@ -209,58 +280,85 @@ def _normalize_sentiment(raw: str) -> str:
     return "neutral"
 
 
-def summarize_and_extract(article: dict) -> dict:
-    """
-    Prend un article (dict avec au moins 'text') et renvoie le même dict
-    enrichi avec :
-      - commodity
-      - event_type
-      - sentiment
-      - analysis (nouveau)
-      - impact   (nouveau)
-      - risks    (nouveau)
-      - outlook  (nouveau)
-      - summary  (pour compatibilité, recopie l'analyse)
-    """
-    raw_text = article.get("text") or ""
-    text = _filter_relevant_text(raw_text)
+def _empty_result(article: dict) -> dict:
+    data = {
+        "commodity": "other",
+        "event_type": "other",
+        "sentiment": "neutral",
+        "analysis": "Pas de contenu pertinent sur les grains dans cet article.",
+        "impact": "",
+        "risks": [],
+        "outlook": "",
+        "summary": "Pas de texte exploitable."
+    }
+    return {**article, **data}
 
-    if not text.strip():
-        data = {
-            "commodity": "other",
-            "event_type": "other",
-            "sentiment": "neutral",
-            "analysis": "Pas de contenu pertinent sur les grains dans cet article.",
-            "impact": "",
-            "risks": [],
-            "outlook": "",
-            "summary": "Pas de texte exploitable."
-        }
-        return {**article, **data}
 
-    prompt = PROMPT.replace("{TEXT}", text)
-
-    completion = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
+def _build_request(prompt: str) -> dict:
+    return {
+        "model": MODEL,
+        "messages": [
             {
                 "role": "system",
-                "content": "You are an expert agricultural commodity analyst focused on grains (wheat, corn, soybeans)."
+                "content": SYSTEM_PROMPT
             },
             {
                 "role": "user",
                 "content": prompt
             }
         ],
-        temperature=0.2,
-    )
+        "temperature": 0.2,
+    }
+
+
+def _get_cache() -> sqlite3.Connection:
+    global _cache_conn
+    if _cache_conn is None:
+        os.makedirs(os.path.dirname(LLM_CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, payload TEXT)"
+        )
+        _cache_conn = conn
+    return _cache_conn
+
+
+def _cache_key(prompt: str) -> str:
+    return hashlib.sha256((MODEL + prompt).encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> dict | None:
+    row = _get_cache().execute(
+        "SELECT payload FROM llm_cache WHERE key = ?", (key,)
+    ).fetchone()
+    if not row:
+        return None
+    raw_data = orjson.loads(row[0])
+    # entrée non-objet (anciens runs) -> ignorée, le LLM sera rappelé
+    return raw_data if isinstance(raw_data, dict) else None
+
 
-    output = completion.choices[0].message.content.strip()
+def _cache_put(key: str, raw_data: dict) -> None:
+    conn = _get_cache()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, payload) VALUES (?, ?)",
+            (key, orjson.dumps(raw_data).decode("utf-8")),
+        )
 
+
+def _parse_output(key: str, output: str) -> dict:
+    """
+    Parse la réponse JSON du LLM. Seuls les objets JSON valides sont mis en
+    cache : toute autre sortie sera redemandée au prochain run.
+    """
     try:
-        raw_data = json.loads(output)
+        raw_data = orjson.loads(output)
     except Exception:
-        raw_data = {
+        raw_data = None
+    if not isinstance(raw_data, dict):
+        return {
             "commodity": "other",
             "event_type": "other",
             "sentiment": "neutral",
@@ -269,7 +367,11 @@ def summarize_and_extract(article: dict) -> dict:
             "risks": [],
             "outlook": ""
         }
+    _cache_put(key, raw_data)
+    return raw_data
 
+
+def _build_result(article: dict, raw_data: dict) -> dict:
     commodity = _normalize_commodity(raw_data.get("commodity"))
     event_type = _normalize_event_type(raw_data.get("event_type"))
     sentiment = _normalize_sentiment(raw_data.get("sentiment"))
@@ -292,4 +394,173 @@ def summarize_and_extract(article: dict) -> dict:
         "summary": summary
     }
 
-    return {**article, **data}
\ No newline at end of file
+    return {**article, **data}
+
+
+def _prepare_batch(articles: list[dict]) -> tuple[list, list]:
+    """
+    Traite sans LLM ce qui peut l'être (texte vide, réponse en cache).
+    Renvoie (résultats partiels, [(index, texte filtré, clé de cache), ...]
+    pour les articles à envoyer au LLM).
+    """
+    results = [None] * len(articles)
+    pending = []
+    for i, article in enumerate(articles):
+        text = _filter_relevant_text(article.get("text") or "")
+        if not text.strip():
+            results[i] = _empty_result(article)
+            continue
+
+        # Même clé que l'appel unitaire : le cache est partagé
+        key = _cache_key(PROMPT.replace("{TEXT}", text))
+        raw_data = _cache_get(key)
+        if raw_data is not None:
+            results[i] = _build_result(article, raw_data)
+        else:
+            pending.append((i, text, key))
+    return results, pending
+
+
+def _batch_prompt(pending: list) -> str:
+    texts = "\n".join(
+        f"<<ART id={j}>>\n{text}\n<<END>>" for j, (_, text, _) in enumerate(pending)
+    )
+    return BATCH_PROMPT.replace("{TEXTS}", texts)
+
+
+def _apply_batch_output(articles: list[dict], results: list, pending: list, output: str) -> list[int]:
+    """
+    Remplit `results` à partir du tableau JSON renvoyé par le LLM.
+    Renvoie les index des articles absents / illisibles (à refaire un par un).
+    """
+    try:
+        items = orjson.loads(output)
+    except Exception:
+        items = []
+
+    by_id = {}
+    if isinstance(items, list):
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                by_id[int(item.get("id"))] = item
+            except (TypeError, ValueError):
+                continue
+
+    missing = []
+    for j, (i, _, key) in enumerate(pending):
+        item = by_id.get(j)
+        if item is None:
+            missing.append(i)
+            continue
+        raw_data = {k: v for k, v in item.items() if k != "id"}
+        _cache_put(key, raw_data)
+        results[i] = _build_result(articles[i], raw_data)
+    return missing
+
+
+def summarize_and_extract(article: dict) -> dict:
+    """
+    Prend un article (dict avec au moins 'text') et renvoie le même dict
+    enrichi avec :
+      - commodity
+      - event_type
+      - sentiment
+      - analysis (nouveau)
+      - impact   (nouveau)
+      - risks    (nouveau)
+      - outlook  (nouveau)
+      - summary  (pour compatibilité, recopie l'analyse)
+    """
+    raw_text = article.get("text") or ""
+    text = _filter_relevant_text(raw_text)
+
+    if not text.strip():
+        return _empty_result(article)
+
+    prompt = PROMPT.replace("{TEXT}", text)
+    key = _cache_key(prompt)
+
+    raw_data = _cache_get(key)
+    if raw_data is None:
+        completion = client.chat.completions.create(**_build_request(prompt))
+        output = completion.choices[0].message.content.strip()
+        raw_data = _parse_output(key, output)
+
+    return _build_result(article, raw_data)
+
+
+async def summarize_and_extract_async(
+    article: dict, sem: asyncio.Semaphore, client: AsyncGroq
+) -> dict:
+    """
+    Version asynchrone de summarize_and_extract (même résultat), pour lancer
+    plusieurs appels Groq en parallèle. `sem` borne le nombre de requêtes
+    simultanées.
+    """
+    raw_text = article.get("text") or ""
+    text = _filter_relevant_text(raw_text)
+
+    if not text.strip():
+        return _empty_result(article)
+
+    prompt = PROMPT.replace("{TEXT}", text)
+    key = _cache_key(prompt)
+
+    raw_data = _cache_get(key)
+    if raw_data is None:
+        async with sem:
+            completion = await client.chat.completions.create(**_build_request(prompt))
+        output = completion.choices[0].message.content.strip()
+        raw_data = _parse_output(key, output)
+
+    return _build_result(article, raw_data)
+
+
+def summarize_and_extract_batch(articles: list[dict], batch_size: int = 8) -> list[dict]:
+    """
+    Même résultat que summarize_and_extract sur chaque article, mais en
+    envoyant jusqu'à `batch_size` articles par requête (réponse = tableau
+    JSON indexé par id). Un article absent de la réponse est refait seul.
+    """
+    enriched = []
+    for start in range(0, len(articles), batch_size):
+        chunk = articles[start:start + batch_size]
+        results, pending = _prepare_batch(chunk)
+
+        if pending:
+            completion = client.chat.completions.create(**_build_request(_batch_prompt(pending)))
+            output = completion.choices[0].message.content.strip()
+            for i in _apply_batch_output(chunk, results, pending, output):
+                results[i] = summarize_and_extract(chunk[i])
+
+        enriched.extend(results)
+    return enriched
+
+
+async def summarize_and_extract_batch_async(
+    articles: list[dict], sem: asyncio.Semaphore, client: AsyncGroq
+) -> list[dict]:
+    """
+    Version asynchrone de summarize_and_extract_batch pour UN lot d'articles
+    (un seul appel Groq) ; à combiner avec asyncio.gather sur plusieurs lots.
+    """
+    results, pending = _prepare_batch(articles)
+
+    if pending:
+        async with sem:
+            completion = await client.chat.completions.create(
+                **_build_request(_batch_prompt(pending))
+            )
+        output = completion.choices[0].message.content.strip()
+
+        missing = _apply_batch_output(articles, results, pending, output)
+        if missing:
+            retried = await asyncio.gather(
+                *[summarize_and_extract_async(articles[i], sem, client) for i in missing]
+            )
+            for i, r in zip(missing, retried):
+                results[i] = r
+
+    return results
@@ -1,38 +1,47 @@
-import yaml
-from datetime import datetime, timedelta, timezone
+import asyncio
+import pandas as pd
+from groq import AsyncGroq
 
-from src.scraping import fetch_source
+from src.scraping import Source, fetch_all, sources_from_config
 from src.parsing import parse_article
-from src.llm_summarizer import summarize_and_extract
+from src.llm_summarizer import summarize_and_extract_batch_async
 from src.scoring import score_article
 from src.storage import save_signals
 from src.reports import generate_daily_report
-from src.alerts import compute_alert
+from src.alerts import compute_alerts_batch
 from src.scoring_macro import compute_macro_score  # <- macro score
 from src.plots import generate_daily_plots
+from src.utils import load_yaml
 
 MAX_AGE_DAYS = 180  # 6 mois ~ 180 jours
+LLM_CONCURRENCY = 8  # nombre max de requêtes Groq simultanées
+LLM_BATCH_SIZE = 8   # articles envoyés par requête Groq
+PLOT_DASHBOARD = False  # True -> aussi les 3 graphes dans une seule image
 
 
-def is_recent(article: dict) -> bool:
-    ts = article.get("published") or article.get("fetched_at")
-    if not ts:
-        return True  # pas de date -> on garde
+def filter_recent(articles: list[dict]) -> list[dict]:
+    """
+    Garde les articles de moins de MAX_AGE_DAYS, avec un seul parsing
+    vectorisé des dates (published, sinon fetched_at).
+    Pas de date ou date illisible -> on garde.
+    """
+    if not articles:
+        return []
 
-    try:
-        # On tronque à la partie 'YYYY-MM-DDTHH:MM:SS'
-        dt = datetime.fromisoformat(ts[:19])
-        # On le rend "aware" en UTC s'il est naïf
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-    except Exception:
-        return True  # en cas de doute, on garde
+    ts = pd.Series([a.get("published") or a.get("fetched_at") for a in articles], dtype=object)
+    ts = ts.where(ts.map(type).eq(str))  # date non-str (datetime, int...) -> on garde
+    # On tronque à la partie 'YYYY-MM-DDTHH:MM:SS' ; naïf -> UTC
+    dt = pd.to_datetime(ts.str.slice(0, 19), format="ISO8601", errors="coerce", utc=True)
 
-    limit = datetime.now(timezone.utc) - timedelta(days=MAX_AGE_DAYS)
-    return dt >= limit
+    limit = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=MAX_AGE_DAYS)
+    keep = dt.isna() | (dt >= limit)
+    return [a for a, k in zip(articles, keep) if k]
 
 
-def load_all_sources(yaml_path: str = "configs/sources.yaml") -> list[dict]:
+def load_all_sources(
+    yaml_path: str = "configs/sources.yaml",
+    only_groups: set[str] | None = None,
+) -> list[Source]:
     """
     Aplati la structure hiérarchique :
     sources:
@@ -40,23 +49,31 @@ def load_all_sources(yaml_path: str = "configs/sources.yaml") -> list[dict]:
       macro: [...]
       fx: [...]
       ...
-    en une liste de dicts avec un champ "group".
+    en une liste de Source (type, url, group, name).
+    Si `only_groups` est donné, les autres groupes sont ignorés.
+    Le YAML n'est parsé qu'une fois par chemin (cache).
     """
-    with open(yaml_path, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
-
-    grouped = cfg["sources"]  # dict: grains / macro / fx / energy / shipping / geopolitics
-    all_sources: list[dict] = []
+    return list(sources_from_config(load_yaml(yaml_path), only_groups))
 
-    for group_name, group_list in grouped.items():
-        if not group_list:
-            continue
-        for s in group_list:
-            item = dict(s)
-            item["group"] = group_name  # ex: "grains", "macro", ...
-            all_sources.append(item)
 
-    return all_sources
+async def enrich_all(
+    articles: list[dict],
+    concurrency: int = LLM_CONCURRENCY,
+    batch_size: int = LLM_BATCH_SIZE,
+) -> list[dict]:
+    """
+    Envoie les articles au LLM par lots de `batch_size`, avec au plus
+    `concurrency` requêtes en vol, en conservant l'ordre des articles.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    async with AsyncGroq() as client:
+        batches = await asyncio.gather(
+            *[
+                summarize_and_extract_batch_async(articles[i:i + batch_size], sem, client)
+                for i in range(0, len(articles), batch_size)
+            ]
+        )
+    return [a for batch in batches for a in batch]
 
 
 def main():
@@ -64,21 +81,19 @@ def main():
 
     # 1) Charger toutes les sources (aplaties)
     # Garder seulement les sources "grains" pour l'instant (performance)
-    sources = [s for s in load_all_sources() if s.get("group") == "grains"]
+    sources = load_all_sources(only_groups={"grains"})
 
     # Limiter le nombre de sources pour des runs rapides (tu peux augmenter plus tard)
     sources = sources[:5]
 
-    # 2) Scraper toutes les sources
+    # 2) Scraper toutes les sources (en parallèle)
     all_raw = []
-    for src in sources:
-        print(f"[INFO] Fetching: {src['name']}")
-        raw_items = fetch_source(src)
+    for src, raw_items in zip(sources, fetch_all(sources)):
         # on garde l'info du groupe sur chaque item brut si besoin plus tard
         for r in raw_items:
             if r is None:
                 continue
-            r["source_group"] = src.get("group", "grains")
+            r["source_group"] = src.group
             all_raw.append(r)
 
     # 3) Parser le HTML / RSS
@@ -89,19 +104,17 @@ def main():
             all_parsed.append(parsed)
 
     # 3bis) Filtre recence (<= 6 mois)
-    recent_parsed = [p for p in all_parsed if is_recent(p)]
+    recent_parsed = filter_recent(all_parsed)
     print(f"[INFO] Keeping {len(recent_parsed)} recent articles out of {len(all_parsed)} total.")
 
     # 4) LLM (résumé + extraction)
-    all_enriched = []
-    for p in recent_parsed:
-        all_enriched.append(summarize_and_extract(p))
+    all_enriched = asyncio.run(enrich_all(recent_parsed))
 
     # 5) Scoring "grains"
     all_scored = [score_article(e) for e in all_enriched]
 
     # 5bis) Alertes (early warning)
-    all_alerted = [compute_alert(e) for e in all_scored]
+    all_alerted = compute_alerts_batch(all_scored)
 
     # 5ter) Macro score (sur les lignes macro, si tu en as)
     # Ici, on considère "macro" = commodity == "other"
@@ -118,7 +131,7 @@ def main():
     # 7) Rapport
     if csv_path:
         generate_daily_report(csv_path)
-        generate_daily_plots(csv_path)
+        generate_daily_plots(csv_path, dashboard=PLOT_DASHBOARD)
 
     print("[DONE] Daily pipeline finished.")
 
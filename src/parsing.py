@@ -1,4 +1,17 @@
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lhtml
+
+
+def _html_root(content):
+    """
+    Parse le HTML avec lxml. Une page déclarant son encodage
+    (<?xml ... encoding=...?>) doit être passée en bytes.
+    """
+    try:
+        return lhtml.fromstring(content)
+    except ValueError:
+        return lhtml.fromstring(content.encode("utf-8"))
+
 
 def parse_article(raw: dict) -> dict:
     """
@@ -13,13 +26,23 @@ def parse_article(raw: dict) -> dict:
             "published": raw.get("published", None)
         }
 
-    # HTML → extraction principale
-    soup = BeautifulSoup(raw["content"], "html.parser")
-    text = " ".join([p.get_text(" ", strip=True) for p in soup.find_all("p")])
+    # HTML → extraction principale (texte des <p>, via XPath)
+    try:
+        root = _html_root(raw["content"])
+    except (etree.ParserError, ValueError):
+        root = None  # page vide / illisible
+
+    if root is None:
+        text = ""
+        title = ""
+    else:
+        text = " ".join(t.strip() for t in root.xpath("//p//text()") if t.strip())
+        title_el = root.find(".//title")
+        title = (title_el.text or "") if title_el is not None else ""
 
     return {
         "url": raw["url"],
-        "title": soup.title.string if soup.title else "",
+        "title": title,
         "text": text,
         "published": raw.get("fetched_at", None)
-    }
\ No newline at end of file
+    }
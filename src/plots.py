@@ -1,99 +1,90 @@
 # src/plots.py
 
 import os
-import csv
-from collections import Counter, defaultdict
 
-import matplotlib.pyplot as plt
+import matplotlib
 
+matplotlib.use("Agg")  # rendu fichier uniquement, pas d'affichage
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from src._sentiment import SENT_MAP
 from src.scoring_macro import compute_macro_score
 
 
-def _load_rows(csv_path: str):
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        return list(csv.DictReader(f))
+_PLOT_COLS = ["commodity", "sentiment", "event_type", "url"]
 
 
-def _sentiment_score(sentiment: str) -> int:
-    s = (sentiment or "").lower()
-    if s == "bullish":
-        return 1
-    if s == "bearish":
-        return -1
-    return 0
+def _load_df(csv_path: str, cols: list[str]) -> pd.DataFrame:
+    """
+    Charge uniquement les colonnes utiles du CSV de signaux.
+    Tout est lu en str ("" pour les cases vides), comme csv.DictReader.
+    """
+    df = pd.read_csv(
+        csv_path,
+        usecols=lambda c: c in cols,
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8",
+    )
+    for c in cols:
+        if c not in df.columns:
+            df[c] = ""
+    return df
 
 
-def plot_articles_by_commodity(csv_path: str, out_dir: str = "figures") -> str:
-    os.makedirs(out_dir, exist_ok=True)
-    rows = _load_rows(csv_path)
+def _commodity(df: pd.DataFrame) -> pd.Series:
+    return df["commodity"].replace("", "other").str.lower()
 
-    counts = Counter((r.get("commodity") or "other").lower() for r in rows)
 
-    labels = list(counts.keys())
-    values = [counts[k] for k in labels]
+def _csv_base(csv_path: str) -> str:
+    return os.path.basename(csv_path).replace("signals_", "").replace(".csv", "")
 
-    plt.figure()
-    plt.bar(labels, values)
-    plt.title("Nombre d'articles par commodity")
-    plt.ylabel("Nombre d'articles")
-    plt.tight_layout()
 
-    base = os.path.basename(csv_path).replace("signals_", "").replace(".csv", "")
-    out_path = os.path.join(out_dir, f"articles_by_commodity_{base}.png")
-    plt.savefig(out_path)
-    plt.close()
+def _new_fig(nrows: int = 1, ncols: int = 1, **kwargs):
+    """
+    Figure objet (sans pyplot ni état global) : les graphes peuvent
+    être tracés en parallèle depuis plusieurs threads.
+    """
+    fig = Figure(**kwargs)
+    return fig, fig.subplots(nrows, ncols)
 
+
+def _save_fig(fig, out_path: str, **kwargs) -> str:
+    fig.savefig(out_path, **kwargs)
     print(f"[PLOT] Saved {out_path}")
     return out_path
 
 
-def plot_sentiment_by_commodity(csv_path: str, out_dir: str = "figures") -> str:
-    os.makedirs(out_dir, exist_ok=True)
-    rows = _load_rows(csv_path)
-
-    scores_sum = defaultdict(int)
-    scores_count = defaultdict(int)
+# ---------- tracés sur un axe ----------
 
-    for r in rows:
-        c = (r.get("commodity") or "other").lower()
-        s = _sentiment_score(r.get("sentiment"))
-        scores_sum[c] += s
-        scores_count[c] += 1
+def _draw_articles_by_commodity(ax, df: pd.DataFrame) -> None:
+    counts = _commodity(df).value_counts(sort=False)
 
-    labels = list(scores_sum.keys())
-    avg_vals = [
-        scores_sum[c] / scores_count[c] if scores_count[c] else 0.0
-        for c in labels
-    ]
+    ax.bar(list(counts.index), counts.tolist())
+    ax.set_title("Nombre d'articles par commodity")
+    ax.set_ylabel("Nombre d'articles")
 
-    plt.figure()
-    plt.bar(labels, avg_vals)
-    plt.title("Sentiment moyen par commodity (bullish = +1, bearish = -1)")
-    plt.ylabel("Score moyen")
-    plt.axhline(0, linestyle="--")
-    plt.tight_layout()
 
-    base = os.path.basename(csv_path).replace("signals_", "").replace(".csv", "")
-    out_path = os.path.join(out_dir, f"sentiment_by_commodity_{base}.png")
-    plt.savefig(out_path)
-    plt.close()
+def _draw_sentiment_by_commodity(ax, df: pd.DataFrame) -> None:
+    scores = df["sentiment"].map(SENT_MAP).fillna(0)
+    avg = scores.groupby(_commodity(df), sort=False).mean()
 
-    print(f"[PLOT] Saved {out_path}")
-    return out_path
+    ax.bar(list(avg.index), avg.tolist())
+    ax.set_title("Sentiment moyen par commodity (bullish = +1, bearish = -1)")
+    ax.set_ylabel("Score moyen")
+    ax.axhline(0, linestyle="--")
 
 
-def plot_macro_score(csv_path: str, out_dir: str = "figures") -> str:
+def _draw_macro_score(ax, df: pd.DataFrame) -> bool:
     """
-    Utilise uniquement les lignes 'macro' (commodity == 'other')
-    et trace un bar chart des scores par thème + score global.
+    Utilise uniquement les lignes 'macro' (commodity == 'other').
+    Retourne False s'il n'y a rien à tracer.
     """
-    os.makedirs(out_dir, exist_ok=True)
-    rows = _load_rows(csv_path)
-
-    macro_rows = [r for r in rows if (r.get("commodity") or "").lower() == "other"]
+    macro_rows = df[df["commodity"].str.lower() == "other"].to_dict("records")
     if not macro_rows:
-        print("[PLOT] No macro rows (commodity='other'), skipping macro plot.")
-        return ""
+        return False
 
     scores = compute_macro_score(macro_rows)
 
@@ -108,28 +99,103 @@ def plot_macro_score(csv_path: str, out_dir: str = "figures") -> str:
         scores.get("final_macro_score", 0),
     ]
 
-    plt.figure()
-    plt.bar(labels, values)
-    plt.title("Score macro-grains par thème (+ global)")
-    plt.ylabel("Score")
-    plt.axhline(0, linestyle="--")
-    plt.tight_layout()
+    ax.bar(labels, values)
+    ax.set_title("Score macro-grains par thème (+ global)")
+    ax.set_ylabel("Score")
+    ax.axhline(0, linestyle="--")
+    return True
 
-    base = os.path.basename(csv_path).replace("signals_", "").replace(".csv", "")
-    out_path = os.path.join(out_dir, f"macro_scores_{base}.png")
-    plt.savefig(out_path)
-    plt.close()
 
-    print(f"[PLOT] Saved {out_path}")
-    return out_path
+# ---------- graphes individuels ----------
+
+def plot_articles_by_commodity(
+    csv_path: str, out_dir: str = "figures", df: pd.DataFrame | None = None
+) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    if df is None:
+        df = _load_df(csv_path, ["commodity"])
+
+    fig, ax = _new_fig()
+    _draw_articles_by_commodity(ax, df)
+    fig.tight_layout()
+
+    out_path = os.path.join(out_dir, f"articles_by_commodity_{_csv_base(csv_path)}.png")
+    return _save_fig(fig, out_path)
+
+
+def plot_sentiment_by_commodity(
+    csv_path: str, out_dir: str = "figures", df: pd.DataFrame | None = None
+) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    if df is None:
+        df = _load_df(csv_path, ["commodity", "sentiment"])
+
+    fig, ax = _new_fig()
+    _draw_sentiment_by_commodity(ax, df)
+    fig.tight_layout()
+
+    out_path = os.path.join(out_dir, f"sentiment_by_commodity_{_csv_base(csv_path)}.png")
+    return _save_fig(fig, out_path)
+
+
+def plot_macro_score(
+    csv_path: str, out_dir: str = "figures", df: pd.DataFrame | None = None
+) -> str:
+    """
+    Utilise uniquement les lignes 'macro' (commodity == 'other')
+    et trace un bar chart des scores par thème + score global.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if df is None:
+        df = _load_df(csv_path, _PLOT_COLS)
+
+    fig, ax = _new_fig()
+    if not _draw_macro_score(ax, df):
+        print("[PLOT] No macro rows (commodity='other'), skipping macro plot.")
+        return ""
+    fig.tight_layout()
+
+    out_path = os.path.join(out_dir, f"macro_scores_{_csv_base(csv_path)}.png")
+    return _save_fig(fig, out_path)
+
+
+# ---------- dashboard ----------
+
+def plot_dashboard(
+    csv_path: str, out_dir: str = "figures", df: pd.DataFrame | None = None
+) -> str:
+    """
+    Les trois graphes du jour côte à côte dans une seule image
+    (un seul chargement du CSV, une seule figure, un seul PNG).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if df is None:
+        df = _load_df(csv_path, _PLOT_COLS)
+
+    fig, axes = _new_fig(1, 3, figsize=(18, 5))
+    _draw_articles_by_commodity(axes[0], df)
+    _draw_sentiment_by_commodity(axes[1], df)
+    if not _draw_macro_score(axes[2], df):
+        axes[2].set_title("Score macro-grains : pas d'articles macro")
+        axes[2].axis("off")
+
+    out_path = os.path.join(out_dir, f"dashboard_{_csv_base(csv_path)}.png")
+    return _save_fig(fig, out_path, dpi=90, bbox_inches="tight")
 
 
-def generate_daily_plots(csv_path: str, out_dir: str = "figures") -> None:
+def generate_daily_plots(
+    csv_path: str, out_dir: str = "figures", dashboard: bool = False
+) -> None:
     """
     Fonction façade : génère tous les graphes du jour.
+    Le CSV n'est lu qu'une fois, puis partagé entre les graphes.
+    `dashboard=True` ajoute l'image unique des trois graphes.
     """
     print("[PLOT] Generating daily plots...")
-    plot_articles_by_commodity(csv_path, out_dir=out_dir)
-    plot_sentiment_by_commodity(csv_path, out_dir=out_dir)
-    plot_macro_score(csv_path, out_dir=out_dir)
-    print("[PLOT] All plots generated.")
\ No newline at end of file
+    df = _load_df(csv_path, _PLOT_COLS)
+    plot_articles_by_commodity(csv_path, out_dir=out_dir, df=df)
+    plot_sentiment_by_commodity(csv_path, out_dir=out_dir, df=df)
+    plot_macro_score(csv_path, out_dir=out_dir, df=df)
+    if dashboard:
+        plot_dashboard(csv_path, out_dir=out_dir, df=df)
+    print("[PLOT] All plots generated.")
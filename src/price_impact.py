@@ -1,47 +1,21 @@
 # src/price_impact.py
 
-from collections import defaultdict
+import numpy as np
+import pandas as pd
 
-# ---------- Helpers basiques ----------
-
-def _safe_get(row, key, default=""):
-    v = row.get(key)
-    return v if v is not None else default
-
-def _sentiment_score(sentiment: str) -> int:
-    s = (sentiment or "").lower()
-    if s == "bullish":
-        return 1
-    if s == "bearish":
-        return -1
-    return 0  # neutral ou inconnu
+from src._confidence_jit import compute_confidence
+from src._sentiment import SENT_MAP
+from src._url_cache import source_quality_url
+from src.utils import safe_get as _safe_get
 
 # ---------- Source quality ----------
 
 def _source_quality(row: dict) -> float:
     """
     Score entre 0.4 et 1.0 selon la "qualité" supposée de la source,
-    basé sur l'URL (heuristique simple).
+    basé sur l'URL (heuristique simple, mémoïsée par URL).
     """
-    url = (_safe_get(row, "url", "") or "").lower()
-
-    if any(x in url for x in [
-        "usda.gov", "fao.org", "igc.int", "ers.usda",
-        "ec.europa.eu", "conab.gov.br", "noaa.gov", "ecmwf.int",
-        "droughtmonitor.unl.edu", "climate.gov"
-    ]):
-        return 1.0  # top tier institutionnel
-
-    if any(x in url for x in [
-        ".gov", ".gouv", ".gov.br", "agmanager.info",
-        "kswheat.com", "kansasagconnection", "agroinformacion",
-        "bolsadecereales", "news.agrofy.com.ar"
-    ]):
-        return 0.7  # bon niveau régional / pro
-
-    if url:
-        return 0.5  # source générique
-    return 0.4      # pas d'URL -> on met un min
+    return source_quality_url((_safe_get(row, "url", "") or "").lower())
 
 # ---------- Event type → impact de base ----------
 
@@ -55,12 +29,24 @@ _EVENT_BASE_IMPACT = {
     "other":     {"ct": 0.1, "mt": 0.2},
 }
 
-def _base_impact_for_event(event_type: str):
-    et = (event_type or "other").lower()
-    return _EVENT_BASE_IMPACT.get(et, _EVENT_BASE_IMPACT["other"])
+# Versions "à plat" pour le calcul vectorisé : event_type -> index,
+# puis lecture des impacts CT / MT dans deux tableaux numpy
+_EVENT_IDX = {et: i for i, et in enumerate(_EVENT_BASE_IMPACT)}
+_OTHER_IDX = _EVENT_IDX["other"]
+_CT_ARR = np.array([v["ct"] for v in _EVENT_BASE_IMPACT.values()], dtype=np.float64)
+_MT_ARR = np.array([v["mt"] for v in _EVENT_BASE_IMPACT.values()], dtype=np.float64)
+_SENT_FACTOR = {"bullish": 1.0, "bearish": -1.0}
+_IMPACT_COLS = ["commodity", "event_type", "sentiment", "analysis", "summary"]
+_GRAINS = ("wheat", "corn", "soy")
+
+# sensibilité FX par matière
+_FX_SENS = {"wheat": 0.25, "corn": 0.45, "soy": 0.70}
 
 # ---------- Confidence score ----------
 
+_ALERT_WEIGHT = {"critical": 1.0, "watch": 0.6}
+_SENT_LABELS = frozenset(("bullish", "bearish", "neutral"))
+
 def _compute_confidence_for_commodity(rows: list[dict], macro_score: dict) -> float:
     """
     Calcule un score de confiance entre 0 et 1 pour une matière donnée.
@@ -74,71 +60,75 @@ def _compute_confidence_for_commodity(rows: list[dict], macro_score: dict) -> fl
     if not rows:
         return 0.0
 
-    # 1) Nombre de news
+    # Une passe sur les lignes -> tableaux numpy
     n = len(rows)
-    n_news_score = min(n / 10.0, 1.0)  # 10 news ou plus -> 1.0
-
-    # 2) Cohérence du sentiment
-    sentiments = []
-    for r in rows:
-        s = (_safe_get(r, "sentiment", "neutral") or "neutral").lower()
-        if s in ("bullish", "bearish", "neutral"):
-            sentiments.append(s)
+    sent = np.fromiter(
+        (SENT_MAP.get(r.get("sentiment") or "", 0) for r in rows), dtype=np.int8, count=n
+    )
+    qual = np.fromiter((_source_quality(r) for r in rows), dtype=np.float64, count=n)
+    alert = np.fromiter(
+        (_ALERT_WEIGHT.get((r.get("alert_severity") or "none").lower(), 0.0) for r in rows),
+        dtype=np.float64,
+        count=n,
+    )
 
-    distinct = set(sentiments)
-    if not sentiments:
+    # Cohérence du sentiment (vide -> "neutral", inconnu -> ignoré)
+    distinct = {
+        (r.get("sentiment") or "neutral").lower() for r in rows
+    } & _SENT_LABELS
+    if not distinct:
         sent_consistency = 0.0
+    elif distinct == {"neutral"}:
+        sent_consistency = 0.3  # tout neutre -> faible cohérence exploitable
+    elif len(distinct) == 1:
+        sent_consistency = 1.0
+    elif len(distinct) == 2:
+        sent_consistency = 0.5
     else:
-        if distinct == {"neutral"}:
-            sent_consistency = 0.3  # tout neutre -> faible cohérence exploitable
-        elif len(distinct) == 1:
-            sent_consistency = 1.0
-        elif len(distinct) == 2:
-            sent_consistency = 0.5
-        else:
-            sent_consistency = 0.0
-
-    # 3) Qualité des sources
-    qualities = [_source_quality(r) for r in rows]
-    source_quality = sum(qualities) / len(qualities) if qualities else 0.4
-    # normalisé déjà entre 0.4 et 1.0
-
-    # 4) Alerte (WATCH / CRITICAL)
-    alert_severities = [(_safe_get(r, "alert_severity", "none") or "none").lower()
-                        for r in rows]
-    max_alert = 0.0
-    for sev in alert_severities:
-        if sev == "critical":
-            max_alert = max(max_alert, 1.0)
-        elif sev == "watch":
-            max_alert = max(max_alert, 0.6)
-
-    # 5) Alignement macro
+        sent_consistency = 0.0
+
+    # Nombre de news, qualité des sources, alertes, alignement macro
     final_macro = macro_score.get("final_macro_score", 0)
-    net_sent = sum(_sentiment_score(_safe_get(r, "sentiment", "neutral")) for r in rows)
+    confidence = compute_confidence(sent, qual, alert, sent_consistency, final_macro)
 
-    if final_macro == 0 or net_sent == 0:
-        macro_align = 0.5  # neutre / pas clair
-    elif final_macro * net_sent > 0:
-        macro_align = 1.0  # même sens
-    else:
-        macro_align = 0.0  # macro en sens inverse
-
-    # Pondération (Option C — balanced)
-    confidence = (
-        0.25 * n_news_score +
-        0.25 * sent_consistency +
-        0.20 * source_quality +
-        0.15 * max_alert +
-        0.15 * macro_align
-    )
+    return round(float(confidence), 3)
 
-    if confidence < 0:
-        confidence = 0.0
-    if confidence > 1:
-        confidence = 1.0
+# ---------- Impact news (vectorisé) ----------
 
-    return round(confidence, 3)
+def _news_impact_frame(grain_rows: list[dict]) -> pd.DataFrame:
+    """
+    Une ligne par article : commodity + contributions CT / MT de l'article
+    (impact de base de l'event_type x facteur sentiment x facteur longueur).
+    """
+    df = pd.DataFrame(grain_rows, columns=_IMPACT_COLS).fillna("").astype(str)
+
+    event_idx = (
+        df["event_type"].str.lower()
+        .map(_EVENT_IDX)
+        .fillna(_OTHER_IDX)
+        .to_numpy(dtype=np.int8)
+    )
+    base_ct = _CT_ARR[event_idx]
+    base_mt = _MT_ARR[event_idx]
+
+    # neutral -> petit signal (0.3), sinon -1 / +1
+    sent = df["sentiment"].str.lower().map(_SENT_FACTOR).fillna(0.0).to_numpy()
+    factor_sent = np.where(sent == 0, 0.3, sent)
+
+    # longueur de l'analyse (ou du résumé à défaut) pour pondérer
+    len_analysis = df["analysis"].str.strip().str.len().to_numpy()
+    len_summary = df["summary"].str.strip().str.len().to_numpy()
+    L = np.where(len_analysis > 0, len_analysis, len_summary)
+    len_factor = np.select([L >= 350, L < 120], [1.1, 0.85], default=1.0)
+
+    return pd.DataFrame(
+        {
+            "commodity": df["commodity"].replace("", "other").str.lower(),
+            "ct": base_ct * factor_sent * len_factor,
+            "mt": base_mt * factor_sent * len_factor,
+        },
+        index=df.index,
+    )
 
 # ---------- Impact prix principal ----------
 
@@ -155,52 +145,20 @@ def compute_price_impact(grain_rows: list[dict], macro_score: dict) -> dict:
       "soy":   {...}
     }
     """
-    by_commodity = defaultdict(list)
-    for r in grain_rows:
-        c = (_safe_get(r, "commodity", "other") or "other").lower()
-        if c in ["wheat", "corn", "soy"]:
-            by_commodity[c].append(r)
-
     impacts = {}
+    if not grain_rows:
+        return impacts
 
-    for commodity, rows in by_commodity.items():
-        if not rows:
-            continue
-
-        # 1) Impact direct news (somme sur les articles)
-        total_ct = 0.0
-        total_mt = 0.0
-
-        for r in rows:
-            etype = (_safe_get(r, "event_type", "other") or "other").lower()
-            base = _base_impact_for_event(etype)
-
-            sent = _safe_get(r, "sentiment", "neutral")
-            sscore = _sentiment_score(sent)
-
-            if sscore == 0:
-                factor_sent = 0.3  # neutral -> petit signal
-            else:
-                factor_sent = float(sscore)  # -1 ou +1
-
-            # longueur de l'analyse pour pondérer
-            text = (_safe_get(r, "analysis", "") or "").strip()
-            if not text:
-                text = (_safe_get(r, "summary", "") or "").strip()
-            L = len(text)
-
-            if L >= 350:
-                len_factor = 1.1
-            elif L < 120:
-                len_factor = 0.85
-            else:
-                len_factor = 1.0
+    news = _news_impact_frame(grain_rows)
+    news = news[news["commodity"].isin(_GRAINS)]
 
-            row_ct = base["ct"] * factor_sent * len_factor
-            row_mt = base["mt"] * factor_sent * len_factor
+    for commodity, g in news.groupby("commodity", sort=False):
+        rows = [grain_rows[i] for i in g.index]
 
-            total_ct += row_ct
-            total_mt += row_mt
+        # 1) Impact direct news (somme sur les articles, dans l'ordre :
+        # la sommation par paires de pandas peut faire basculer un seuil)
+        total_ct = sum(g["ct"].tolist())
+        total_mt = sum(g["mt"].tolist())
 
         # 2) Impact macro (modeste mais non nul)
         # coefficients simples, option C (balanced)
@@ -209,9 +167,7 @@ def compute_price_impact(grain_rows: list[dict], macro_score: dict) -> dict:
         weather_score = macro_score.get("weather", 0)
         shipping_score = macro_score.get("shipping", 0)
 
-        # sensibilité FX par matière
-        fx_sens = {"wheat": 0.25, "corn": 0.45, "soy": 0.70}
-        this_fx_sens = fx_sens.get(commodity, 0.3)
+        this_fx_sens = _FX_SENS.get(commodity, 0.3)
 
         macro_ct = (
             0.30 * weather_score +   # météo globale
@@ -1,10 +1,19 @@
-import csv
+import io
 import os
-import json
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from src._sentiment import SENT_MAP
+from src._url_cache import ET_DIRECT, make_theme_classifier
 from src.scoring_macro import compute_macro_score
 from src.price_impact import compute_price_impact
+from src.utils import safe_get as _safe_get
 from src.plots import (
     plot_articles_by_commodity,
     plot_sentiment_by_commodity,
@@ -14,21 +23,21 @@ from src.plots import (
 # Horizon utilisé dans le backtest (en jours)
 FORWARD_DAYS = 5
 
-# ---------- Helpers génériques ----------
-
+# Colonnes du CSV de signaux utilisées par le rapport
+_REPORT_COLS = [
+    "title", "url", "commodity", "event_type", "sentiment",
+    "analysis", "impact", "risks", "outlook", "summary",
+    "alert_score", "alert_severity", "alert_tags",
+]
+# Colonnes à faible cardinalité : encodées en dictionnaire (chaque valeur
+# distincte n'est stockée / convertie qu'une fois)
+_DICT_COLS = ("commodity", "event_type", "sentiment", "alert_severity")
+_STR_DICT = pa.dictionary(pa.int32(), pa.string())
+_GRAIN_ORDER = ("wheat", "corn", "soy")  # ordre d'affichage
+_GRAIN_SET = frozenset(_GRAIN_ORDER)
+_ALERT_LEVELS = pa.array(["watch", "critical"])
 
-def _safe_get(row, key, default=""):
-    v = row.get(key)
-    return v if v is not None else default
-
-
-def _sentiment_score(sentiment: str) -> int:
-    s = (sentiment or "").lower()
-    if s == "bullish":
-        return 1
-    if s == "bearish":
-        return -1
-    return 0
+# ---------- Helpers génériques ----------
 
 
 def _bias_label(score: int) -> str:
@@ -42,6 +51,18 @@ def _bias_label(score: int) -> str:
 # ---------- Macro helpers ----------
 
 
+# Mots-clés d'URL par thème pour le rapport (un peu plus larges que
+# ceux du scoring : "usdars", "brent")
+_classify = make_theme_classifier(
+    [
+        ("weather", ["noaa", "droughtmonitor", "ecmwf", "climate.gov"]),
+        ("fx", ["currencies/usd", "dollar-index", "usd-brl", "usd-ars", "usdars"]),
+        ("energy", ["brent-oil", "brent", "eia.gov", "energy"]),
+        ("shipping", ["splash247", "blackseagrain", "baltic"]),
+    ]
+)
+
+
 def classify_macro_theme(row: dict) -> str:
     """
     Classe un article 'macro' dans un thème :
@@ -49,41 +70,282 @@ def classify_macro_theme(row: dict) -> str:
     basé sur event_type + url.
     """
     et = (_safe_get(row, "event_type", "other") or "other").lower()
-    url = (_safe_get(row, "url", "") or "").lower()
+    hit = ET_DIRECT.get(et)
+    if hit:
+        return hit  # pas besoin de l'URL
 
-    # Météo
-    if et == "weather" or any(
-        x in url for x in ["noaa", "droughtmonitor", "ecmwf", "climate.gov"]
-    ):
-        return "weather"
+    url = (_safe_get(row, "url", "") or "").lower()
+    return _classify(et, url)
 
-    # FX / devises
-    if any(
-        x in url
-        for x in ["currencies/usd", "dollar-index", "usd-brl", "usd-ars", "usdars"]
-    ):
-        return "fx"
 
-    # Énergie
-    if any(x in url for x in ["brent-oil", "brent", "eia.gov", "energy"]):
-        return "energy"
+def _read_signals(csv_path: str) -> pa.Table:
+    """
+    Lit uniquement les colonnes utiles du CSV de signaux, en colonnes Arrow
+    (str, "" pour les cases vides, null pour une colonne absente),
+    alert_score converti en int.
+    """
+    try:
+        tbl = pacsv.read_csv(
+            csv_path,
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=_REPORT_COLS,
+                include_missing_columns=True,
+                column_types={
+                    c: _STR_DICT if c in _DICT_COLS else pa.string() for c in _REPORT_COLS
+                },
+            ),
+        )
+    except pa.ArrowInvalid as e:  # fichier vide / illisible
+        print(f"[WARN] Could not read {csv_path} -> {e}")
+        return pa.table({c: pa.array([], pa.string()) for c in _REPORT_COLS})
+
+    # alert_score : entier, 0 si vide ou invalide
+    score = pc.utf8_trim_whitespace(pc.fill_null(tbl["alert_score"], "0"))
+    score = pc.if_else(pc.match_substring_regex(score, r"^[+-]?\d+$"), score, "0")
+    score = pc.cast(pc.utf8_ltrim(score, characters="+"), pa.int32())
+    return tbl.set_column(tbl.schema.get_field_index("alert_score"), "alert_score", score)
+
+
+def _lower(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Minuscules ; sur une colonne dictionnaire, seules les valeurs distinctes sont converties."""
+    if not pa.types.is_dictionary(col.type):
+        return pc.utf8_lower(col)
+    return pa.chunked_array(
+        [
+            pa.DictionaryArray.from_arrays(chunk.indices, pc.utf8_lower(chunk.dictionary))
+            for chunk in col.chunks
+        ],
+        type=col.type,
+    )
 
-    # Shipping / logistique
-    if et == "logistics" or any(
-        x in url for x in ["splash247", "blackseagrain", "baltic"]
-    ):
-        return "shipping"
 
-    return "other"
+def _group_key(row: dict) -> tuple[str, str]:
+    """("grain", matière) pour wheat / corn / soy, sinon ("macro", thème)."""
+    c = (_safe_get(row, "commodity", "other") or "other").lower()
+    if c in _GRAIN_SET:
+        return ("grain", c)
+    return ("macro", classify_macro_theme(row))
 
 
 def _macro_score(rows):
     score = 0
     for r in rows:
-        score += _sentiment_score(_safe_get(r, "sentiment", "neutral"))
+        score += SENT_MAP.get(r.get("sentiment") or "", 0)
     return score
 
 
+# ---------- Rendu Markdown (une fonction par section) ----------
+
+_THEME_LABELS = {
+    "weather": "Météo",
+    "fx": "Devises (FX)",
+    "energy": "Énergie",
+    "shipping": "Logistique / Shipping",
+    "other": "Autres facteurs",
+}
+
+
+def _texts(rows, key: str) -> list[str]:
+    """Valeurs non vides (strippées) d'une colonne texte."""
+    return [t for t in ((_safe_get(r, key, "") or "").strip() for r in rows) if t]
+
+
+def _bullets(items) -> str:
+    return "".join(f"- {x}\n" for x in items)
+
+
+def _titled_bullets(title: str, items) -> str:
+    """Bloc "**titre**" + liste à puces + ligne vide ("" si liste vide)."""
+    if not items:
+        return ""
+    return f"**{title}**\n{_bullets(items)}\n"
+
+
+def _render_sources(buf, rows) -> None:
+    links = []
+    for r in rows[:8]:
+        title = _safe_get(r, "title", "Sans titre").strip() or "Sans titre"
+        url = _safe_get(r, "url", "").strip()
+        links.append(f"[{title}]({url})" if url else title)
+    buf.write(f"**Sources :**\n{_bullets(links)}\n")
+
+
+def _render_header(buf, date_part: str, macro_score_dict: dict) -> None:
+    m = macro_score_dict
+    buf.write(f"""# Daily Grain Intelligence Report — {date_part}
+
+## 🧭 Indicateur Macro-Grains
+
+- **Score global** : {m.get("final_macro_score", 0)} / 5
+- **Météo** : {m.get("weather", 0)}
+- **Devises (FX)** : {m.get("fx", 0)}
+- **Énergie** : {m.get("energy", 0)}
+- **Logistique / Shipping** : {m.get("shipping", 0)}
+- **Autres facteurs** : {m.get("other", 0)}
+
+## 📊 Graphiques du jour
+
+### Nombre d'articles par commodity
+![Articles par commodity](../figures/articles_by_commodity_{date_part}.png)
+
+### Sentiment moyen par commodity
+![Sentiment par commodity](../figures/sentiment_by_commodity_{date_part}.png)
+
+### Score macro-grains par thème
+![Score macro](../figures/macro_scores_{date_part}.png)
+
+""")
+
+
+def _render_alerts(buf, alert_rows) -> None:
+    buf.write("## ALERTES DU JOUR 🔔\n\n")
+
+    if not alert_rows:
+        buf.write("_Aucune alerte significative aujourd'hui._\n\n")
+        return
+
+    for r in alert_rows:
+        title = _safe_get(r, "title", "Sans titre").strip() or "Sans titre"
+        url = _safe_get(r, "url", "").strip()
+        severity = (r.get("alert_severity") or "none").lower()
+        tags = (r.get("alert_tags") or "").strip()
+        summary = (_safe_get(r, "summary", "") or "").strip()
+
+        link = f"[Lien]({url})\n" if url else ""
+        tags_line = f"- Mots-clés risque : `{tags}`\n" if tags else ""
+        quote = f"\n> {summary}\n\n" if summary else ""
+
+        buf.write(f"""### [{severity.upper()}] {title}
+{link}- Commodity : **{_safe_get(r, "commodity", "other")}**
+- Type : **{_safe_get(r, "event_type", "other")}**
+- Score alerte : **{r.get("alert_score", 0)}**
+{tags_line}{quote}
+""")
+
+
+def _render_commodity(buf, commodity: str, items, imp) -> None:
+    # Biais global LLM
+    total_score = sum(SENT_MAP.get(r.get("sentiment") or "", 0) for r in items)
+    buf.write(
+        f"## {commodity.capitalize()}\n\n"
+        f"**Biais de marché (LLM) :** {_bias_label(total_score)}\n\n"
+    )
+
+    # Impact prix quantifié (à partir du backtest + macro)
+    if imp:
+        ct_low, ct_high = imp["ct_low"], imp["ct_high"]
+        mt_low, mt_high = imp["mt_low"], imp["mt_high"]
+
+        if ct_low == 0 and ct_high == 0 and mt_low == 0 and mt_high == 0:
+            signal = (
+                "- Signal global : **neutre** "
+                "(pas d'impact prix significatif détecté)\n"
+            )
+        else:
+            signal = (
+                f"- Court terme (1–3 jours) : **{ct_low:+.2f}% → {ct_high:+.2f}%**\n"
+                f"- Moyen terme (7–20 jours) : **{mt_low:+.2f}% → {mt_high:+.2f}%**\n"
+            )
+        buf.write(
+            "### Impact quantifié sur les prix\n\n"
+            f"{signal}"
+            f"- Confiance du signal : **{imp['confidence']:.2f}**\n\n"
+        )
+
+    # Résumé analytique (LLM)
+    analyses = _texts(items, "analysis")
+    buf.write(
+        _titled_bullets("Résumé analytique :", analyses[:5])
+        or "**Résumé analytique :**\n- Aucune analyse disponible.\n\n"
+    )
+
+    # Impact sur les prix (narratif LLM)
+    buf.write(_titled_bullets("Impact sur les prix (narratif LLM) :", _texts(items, "impact")[:3]))
+
+    # Risques (dédoublonnés, ordre conservé)
+    risks = []
+    for r in items:
+        r_list = r.get("risks")
+        if isinstance(r_list, list):
+            risks.extend([str(x).strip() for x in r_list if str(x).strip()])
+    buf.write(_titled_bullets("Risques clés :", list(dict.fromkeys(risks))[:5]))
+
+    # Perspectives
+    buf.write(_titled_bullets("Perspectives court terme :", _texts(items, "outlook")[:3]))
+
+    # Sources
+    _render_sources(buf, items)
+
+
+def _render_macro(buf, macro_by_theme) -> None:
+    buf.write("## Macro marché (tous grains)\n\n")
+
+    themes = [t for t in _THEME_LABELS if macro_by_theme.get(t)]
+
+    scores = "".join(
+        f"- {_THEME_LABELS[t]} : score **{_macro_score(macro_by_theme[t])}** "
+        f"(sur {len(macro_by_theme[t])} news)\n"
+        for t in themes
+    )
+    buf.write(f"**Scores macro par thème :**\n{scores}\n")
+
+    # Détail par thème
+    for theme in themes:
+        rows_theme = macro_by_theme[theme]
+        buf.write(f"### {_THEME_LABELS[theme]}\n\n")
+        buf.write(_titled_bullets("Résumé analytique :", _texts(rows_theme, "analysis")[:3]))
+        buf.write(_titled_bullets("Impact sur les prix :", _texts(rows_theme, "impact")[:3]))
+        buf.write(_titled_bullets("Perspectives court terme :", _texts(rows_theme, "outlook")[:3]))
+        _render_sources(buf, rows_theme)
+
+
+def _render_backtest(buf, bt: dict) -> None:
+    buf.write("## 📈 Backtest – Performance historique des signaux\n\n")
+
+    g = bt.get("global", {}) or {}
+    n_sig = g.get("n_signals", 0)
+    if n_sig:
+        buf.write(f"- Nombre total de signaux backtestés : **{n_sig}**\n")
+        if g.get("mean_fwd_return") is not None:
+            buf.write(
+                f"- Retour moyen à {FORWARD_DAYS} jours : "
+                f"**{g['mean_fwd_return']*100:.2f} %**\n"
+            )
+
+        bull_n, bull_m = g.get("bullish_n", 0), g.get("bullish_mean")
+        bear_n, bear_m = g.get("bearish_n", 0), g.get("bearish_mean")
+        if bull_n and bull_m is not None:
+            buf.write(f"- Signaux **bullish** : {bull_n} | retour moyen : **{bull_m*100:.2f} %**\n")
+        if bear_n and bear_m is not None:
+            buf.write(f"- Signaux **bearish** : {bear_n} | retour moyen : **{bear_m*100:.2f} %**\n")
+        buf.write("\n")
+
+    # Détail par commodity
+    byc = bt.get("by_commodity", {}) or {}
+    if not byc:
+        return
+
+    buf.write("### Détail par commodity\n\n")
+    for comm in _GRAIN_ORDER:
+        d = byc.get(comm)
+        if not d:
+            continue
+
+        buf.write(f"**{comm.capitalize()}** :\n- N signaux : {d.get('n_signals', 0)}\n")
+        if d.get("mean_fwd_return") is not None:
+            buf.write(f"- Retour moyen : **{d['mean_fwd_return']*100:.2f} %**\n")
+
+        bn, bm = d.get("bullish_n", 0), d.get("bullish_mean")
+        if bn and bm is not None:
+            buf.write(f"- Bullish ({bn}) : **{bm*100:.2f} %**\n")
+
+        bn2, bm2 = d.get("bearish_n", 0), d.get("bearish_mean")
+        if bn2 and bm2 is not None:
+            buf.write(f"- Bearish ({bn2}) : **{bm2*100:.2f} %**\n")
+        buf.write("\n")
+
+
 # ---------- Rapport principal ----------
 
 
@@ -106,10 +368,9 @@ def generate_daily_report(csv_path: str, out_dir: str = "reports") -> str:
 
     os.makedirs(out_dir, exist_ok=True)
 
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
+    tbl = _read_signals(csv_path)
 
-    if not rows:
+    if not tbl.num_rows:
         print("[INFO] No rows to report.")
         return ""
 
@@ -118,41 +379,23 @@ def generate_daily_report(csv_path: str, out_dir: str = "reports") -> str:
 
     # ---------- Gestion des alertes (early warning) ----------
 
-    for r in rows:
-        try:
-            r["alert_score"] = int(r.get("alert_score", 0))
-        except Exception:
-            r["alert_score"] = 0
-
-    alert_rows = [
-        r
-        for r in rows
-        if (r.get("alert_severity") or "").lower() in ("watch", "critical")
-    ]
-    alert_rows.sort(key=lambda x: x.get("alert_score", 0), reverse=True)
+    alert_tbl = tbl.filter(pc.is_in(_lower(tbl["alert_severity"]), value_set=_ALERT_LEVELS))
+    alert_rows = alert_tbl.sort_by([("alert_score", "descending")]).slice(0, 10).to_pylist()
 
-    # ---------- Séparation grains / macro ----------
+    # ---------- Séparation grains / macro + groupements ----------
+    # un seul tri (stable : ordre du CSV conservé dans chaque groupe)
+    # puis un seul passage groupby pour matières et thèmes macro
 
-    grain_rows = []
-    macro_rows = []
-    for r in rows:
-        c = (_safe_get(r, "commodity", "other") or "other").lower()
-        if c in ["wheat", "corn", "soy"]:
-            grain_rows.append(r)
-        else:
-            macro_rows.append(r)
+    keyed = sorted(((_group_key(r), r) for r in tbl.to_pylist()), key=itemgetter(0))
 
-    # Groupement par matière
-    by_commodity = defaultdict(list)
-    for r in grain_rows:
-        c = (_safe_get(r, "commodity", "other") or "other").lower()
-        by_commodity[c].append(r)
+    by_commodity = {}
+    macro_by_theme = {}
+    for (bucket, name), grp in groupby(keyed, key=itemgetter(0)):
+        target = by_commodity if bucket == "grain" else macro_by_theme
+        target[name] = [r for _, r in grp]
 
-    # Groupement macro par thème
-    macro_by_theme = defaultdict(list)
-    for r in macro_rows:
-        theme = classify_macro_theme(r)
-        macro_by_theme[theme].append(r)
+    grain_rows = [r for items in by_commodity.values() for r in items]
+    macro_rows = [r for items in macro_by_theme.values() for r in items]
 
     # ---------- Macro score global & impact prix ----------
 
@@ -162,363 +405,45 @@ def generate_daily_report(csv_path: str, out_dir: str = "reports") -> str:
     price_impact_dict = compute_price_impact(grain_rows, macro_score_dict)
 
     # ---------- Construction du Markdown ----------
-    lines = []
-    lines.append(f"# Daily Grain Intelligence Report — {date_part}\n")
-
-    # ================
-    # Indicateur macro
-    # ================
-
-    lines.append("## 🧭 Indicateur Macro-Grains\n")
-    final_macro = macro_score_dict.get("final_macro_score", 0)
-    lines.append(f"- **Score global** : {final_macro} / 5")
-    lines.append(f"- **Météo** : {macro_score_dict.get('weather', 0)}")
-    lines.append(f"- **Devises (FX)** : {macro_score_dict.get('fx', 0)}")
-    lines.append(f"- **Énergie** : {macro_score_dict.get('energy', 0)}")
-    lines.append(
-        f"- **Logistique / Shipping** : {macro_score_dict.get('shipping', 0)}"
-    )
-    lines.append(f"- **Autres facteurs** : {macro_score_dict.get('other', 0)}\n")
-
-    # ================
-    # Graphiques
-    # ================
+    buf = io.StringIO()
 
-    lines.append("## 📊 Graphiques du jour\n")
+    _render_header(buf, date_part, macro_score_dict)
+    _render_alerts(buf, alert_rows)
 
-    lines.append("### Nombre d'articles par commodity")
-    lines.append(
-        f"![Articles par commodity](../figures/articles_by_commodity_{date_part}.png)\n"
-    )
-
-    lines.append("### Sentiment moyen par commodity")
-    lines.append(
-        f"![Sentiment par commodity](../figures/sentiment_by_commodity_{date_part}.png)\n"
-    )
-
-    lines.append("### Score macro-grains par thème")
-    lines.append(
-        f"![Score macro](../figures/macro_scores_{date_part}.png)\n"
-    )
-
-    # ============================
-    #   SECTION ALERTES DU JOUR
-    # ============================
-
-    lines.append("## ALERTES DU JOUR 🔔\n")
-
-    if not alert_rows:
-        lines.append("_Aucune alerte significative aujourd'hui._\n")
-    else:
-        for r in alert_rows[:10]:
-            title = _safe_get(r, "title", "Sans titre").strip() or "Sans titre"
-            url = _safe_get(r, "url", "").strip()
-            commodity = _safe_get(r, "commodity", "other")
-            event_type = _safe_get(r, "event_type", "other")
-            severity = (r.get("alert_severity") or "none").lower()
-            score = r.get("alert_score", 0)
-            tags = (r.get("alert_tags") or "").strip()
-
-            lines.append(f"### [{severity.upper()}] {title}")
-            if url:
-                lines.append(f"[Lien]({url})")
-            lines.append(f"- Commodity : **{commodity}**")
-            lines.append(f"- Type : **{event_type}**")
-            lines.append(f"- Score alerte : **{score}**")
-            if tags:
-                lines.append(f"- Mots-clés risque : `{tags}`")
-
-            summary = (_safe_get(r, "summary", "") or "").strip()
-            if summary:
-                lines.append(f"\n> {summary}\n")
-            lines.append("")
-
-    # ============================
-    #   SECTIONS PAR MATIÈRE
-    # ============================
-
-    for commodity in ["wheat", "corn", "soy"]:
+    for commodity in _GRAIN_ORDER:
         items = by_commodity.get(commodity, [])
-        if not items:
-            continue
-
-        lines.append(f"## {commodity.capitalize()}\n")
-
-        # Biais global LLM
-        total_score = sum(
-            _sentiment_score(_safe_get(r, "sentiment", "neutral")) for r in items
-        )
-        bias = _bias_label(total_score)
-        lines.append(f"**Biais de marché (LLM) :** {bias}\n")
-
-        # Impact prix quantifié (à partir du backtest + macro)
-        imp = price_impact_dict.get(commodity)
-        if imp:
-            ct_low = imp["ct_low"]
-            ct_high = imp["ct_high"]
-            mt_low = imp["mt_low"]
-            mt_high = imp["mt_high"]
-            conf = imp["confidence"]
-
-            lines.append("### Impact quantifié sur les prix\n")
-            if (
-                ct_low == 0
-                and ct_high == 0
-                and mt_low == 0
-                and mt_high == 0
-            ):
-                lines.append(
-                    "- Signal global : **neutre** "
-                    "(pas d'impact prix significatif détecté)"
-                )
-            else:
-                lines.append(
-                    f"- Court terme (1–3 jours) : **{ct_low:+.2f}% → {ct_high:+.2f}%**"
-                )
-                lines.append(
-                    f"- Moyen terme (7–20 jours) : **{mt_low:+.2f}% → {mt_high:+.2f}%**"
-                )
-            lines.append(f"- Confiance du signal : **{conf:.2f}**\n")
-
-        # Résumé analytique (LLM)
-        analyses = [
-            _safe_get(r, "analysis", "").strip()
-            for r in items
-            if _safe_get(r, "analysis", "").strip()
-        ]
-        if analyses:
-            lines.append("**Résumé analytique :**")
-            for a in analyses[:5]:
-                lines.append(f"- {a}")
-            lines.append("")
-        else:
-            lines.append("**Résumé analytique :**")
-            lines.append("- Aucune analyse disponible.\n")
-
-        # Impact sur les prix (narratif LLM)
-        impacts = [
-            _safe_get(r, "impact", "").strip()
-            for r in items
-            if _safe_get(r, "impact", "").strip()
-        ]
-        if impacts:
-            lines.append("**Impact sur les prix (narratif LLM) :**")
-            for imp_text in impacts[:3]:
-                lines.append(f"- {imp_text}")
-            lines.append("")
-
-        # Risques
-        risks = []
-        for r in items:
-            r_list = r.get("risks")
-            if isinstance(r_list, list):
-                risks.extend(
-                    [str(x).strip() for x in r_list if str(x).strip()]
-                )
-        if risks:
-            lines.append("**Risques clés :**")
-            seen = set()
-            clean_risks = []
-            for ri in risks:
-                if ri not in seen:
-                    seen.add(ri)
-                    clean_risks.append(ri)
-            for ri in clean_risks[:5]:
-                lines.append(f"- {ri}")
-            lines.append("")
-
-        # Perspectives
-        outlooks = [
-            _safe_get(r, "outlook", "").strip()
-            for r in items
-            if _safe_get(r, "outlook", "").strip()
-        ]
-        if outlooks:
-            lines.append("**Perspectives court terme :**")
-            for o in outlooks[:3]:
-                lines.append(f"- {o}")
-            lines.append("")
-
-        # Sources
-        lines.append("**Sources :**")
-        for r in items[:8]:
-            title = _safe_get(r, "title", "Sans titre").strip() or "Sans titre"
-            url = _safe_get(r, "url", "").strip()
-            if url:
-                lines.append(f"- [{title}]({url})")
-            else:
-                lines.append(f"- {title}")
-        lines.append("")
-
-    # ============================
-    #   SECTION MACRO MARCHÉ
-    # ============================
+        if items:
+            _render_commodity(buf, commodity, items, price_impact_dict.get(commodity))
 
     if macro_rows:
-        lines.append("## Macro marché (tous grains)\n")
-
-        label = {
-            "weather": "Météo",
-            "fx": "Devises (FX)",
-            "energy": "Énergie",
-            "shipping": "Logistique / Shipping",
-            "other": "Autres facteurs",
-        }
-
-        lines.append("**Scores macro par thème :**")
-        for theme in ["weather", "fx", "energy", "shipping", "other"]:
-            rows_theme = macro_by_theme.get(theme, [])
-            if not rows_theme:
-                continue
-            sc = _macro_score(rows_theme)
-            n = len(rows_theme)
-            lines.append(
-                f"- {label[theme]} : score **{sc}** (sur {n} news)"
-            )
-        lines.append("")
-
-        # Détail par thème
-        for theme in ["weather", "fx", "energy", "shipping", "other"]:
-            rows_theme = macro_by_theme.get(theme, [])
-            if not rows_theme:
-                continue
-
-            lines.append(f"### {label[theme]}\n")
-
-            # Résumé analytique
-            analyses = [
-                _safe_get(r, "analysis", "").strip()
-                for r in rows_theme
-                if _safe_get(r, "analysis", "").strip()
-            ]
-            if analyses:
-                lines.append("**Résumé analytique :**")
-                for a in analyses[:3]:
-                    lines.append(f"- {a}")
-                lines.append("")
-
-            # Impact prix (narratif)
-            impacts = [
-                _safe_get(r, "impact", "").strip()
-                for r in rows_theme
-                if _safe_get(r, "impact", "").strip()
-            ]
-            if impacts:
-                lines.append("**Impact sur les prix :**")
-                for imp in impacts[:3]:
-                    lines.append(f"- {imp}")
-                lines.append("")
-
-            # Perspectives
-            outlooks = [
-                _safe_get(r, "outlook", "").strip()
-                for r in rows_theme
-                if _safe_get(r, "outlook", "").strip()
-            ]
-            if outlooks:
-                lines.append("**Perspectives court terme :**")
-                for o in outlooks[:3]:
-                    lines.append(f"- {o}")
-                lines.append("")
-
-            # Sources macro
-            lines.append("**Sources :**")
-            for r in rows_theme[:8]:
-                title = _safe_get(r, "title", "Sans titre").strip() or "Sans titre"
-                url = _safe_get(r, "url", "").strip()
-                if url:
-                    lines.append(f"- [{title}]({url})")
-                else:
-                    lines.append(f"- {title}")
-            lines.append("")
-
-    # ============================
-    #   SECTION BACKTEST (si dispo)
-    # ============================
+        _render_macro(buf, macro_by_theme)
 
+    # Backtest (si dispo)
     bt_path = "data/backtest_summary.json"
     if os.path.exists(bt_path):
         try:
-            with open(bt_path, "r", encoding="utf-8") as f:
-                bt = json.load(f)
-        except Exception:
+            with open(bt_path, "rb") as f:
+                bt = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
             bt = None
 
         if bt:
-            lines.append("## 📈 Backtest – Performance historique des signaux\n")
-
-            g = bt.get("global", {}) or {}
-            n_sig = g.get("n_signals", 0)
-            if n_sig:
-                lines.append(
-                    f"- Nombre total de signaux backtestés : **{n_sig}**"
-                )
-                if g.get("mean_fwd_return") is not None:
-                    lines.append(
-                        f"- Retour moyen à {FORWARD_DAYS} jours : "
-                        f"**{g['mean_fwd_return']*100:.2f} %**"
-                    )
-
-                bull_n = g.get("bullish_n", 0)
-                bear_n = g.get("bearish_n", 0)
-                bull_m = g.get("bullish_mean")
-                bear_m = g.get("bearish_mean")
-
-                if bull_n and bull_m is not None:
-                    lines.append(
-                        f"- Signaux **bullish** : {bull_n} | retour moyen : **{bull_m*100:.2f} %**"
-                    )
-                if bear_n and bear_m is not None:
-                    lines.append(
-                        f"- Signaux **bearish** : {bear_n} | retour moyen : **{bear_m*100:.2f} %**"
-                    )
-
-                lines.append("")
-
-            # Détail par commodity
-            byc = bt.get("by_commodity", {}) or {}
-            if byc:
-                lines.append("### Détail par commodity\n")
-                for comm in ["wheat", "corn", "soy"]:
-                    d = byc.get(comm)
-                    if not d:
-                        continue
-
-                    lines.append(f"**{comm.capitalize()}** :")
-                    lines.append(f"- N signaux : {d.get('n_signals', 0)}")
-
-                    if d.get("mean_fwd_return") is not None:
-                        lines.append(
-                            f"- Retour moyen : **{d['mean_fwd_return']*100:.2f} %**"
-                        )
-
-                    bn = d.get("bullish_n", 0)
-                    bm = d.get("bullish_mean")
-                    if bn and bm is not None:
-                        lines.append(
-                            f"- Bullish ({bn}) : **{bm*100:.2f} %**"
-                        )
-
-                    bn2 = d.get("bearish_n", 0)
-                    bm2 = d.get("bearish_mean")
-                    if bn2 and bm2 is not None:
-                        lines.append(
-                            f"- Bearish ({bn2}) : **{bm2*100:.2f} %**"
-                        )
-                    lines.append("")
+            _render_backtest(buf, bt)
 
     # ---------- Écriture fichier ----------
-    content = "\n".join(lines)
+    # chaque ligne se termine par "\n" : on retire le dernier
+    # (même sortie qu'un "\n".join des lignes)
+    content = buf.getvalue()[:-1]
     out_path = os.path.join(out_dir, f"daily_{date_part}.md")
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(content)
 
     print(f"[OK] Nouveau rapport écrit → {out_path}")
 
-    # ---------- Graphiques ----------
+    # ---------- Graphiques (en parallèle, le rapport est déjà écrit) ----------
     os.makedirs("figures", exist_ok=True)
-    plot_articles_by_commodity(csv_path, date_part)
-    plot_sentiment_by_commodity(csv_path, date_part)
-    plot_macro_score(csv_path, date_part)
+    plot_fns = [plot_articles_by_commodity, plot_sentiment_by_commodity, plot_macro_score]
+    with ThreadPoolExecutor(max_workers=len(plot_fns)) as pool:
+        list(pool.map(lambda fn: fn(csv_path, date_part), plot_fns))
 
     return out_path
\ No newline at end of file
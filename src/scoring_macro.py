@@ -2,19 +2,15 @@
 
 from typing import List, Dict, Any
 
+import numpy as np
 
-def _safe_get(row: Dict[str, Any], key: str, default: str = "") -> str:
-    v = row.get(key)
-    return v if v is not None else default
+from src._sentiment import SENT_MAP
+from src._url_cache import ET_DIRECT, classify_theme
+from src.utils import safe_get as _safe_get
 
 
-def _sentiment_score(sentiment: str) -> int:
-    s = (sentiment or "").lower()
-    if s == "bullish":
-        return 1
-    if s == "bearish":
-        return -1
-    return 0
+MACRO_THEMES = ("weather", "fx", "energy", "shipping", "other")
+_THEME_IDX = {t: i for i, t in enumerate(MACRO_THEMES)}
 
 
 def classify_macro_theme(row: Dict[str, Any]) -> str:
@@ -25,25 +21,12 @@ def classify_macro_theme(row: Dict[str, Any]) -> str:
     (Version locale à ce module pour éviter l'import circulaire.)
     """
     et = (_safe_get(row, "event_type", "other") or "other").lower()
-    url = (_safe_get(row, "url", "") or "").lower()
-
-    # Météo
-    if et == "weather" or any(x in url for x in ["noaa", "droughtmonitor", "ecmwf", "climate.gov"]):
-        return "weather"
-
-    # FX / devises
-    if any(x in url for x in ["currencies/usd", "dollar-index", "usd-brl", "usd-ars"]):
-        return "fx"
-
-    # Énergie
-    if any(x in url for x in ["brent-oil", "eia.gov", "energy"]):
-        return "energy"
-
-    # Shipping / logistique
-    if et == "logistics" or any(x in url for x in ["splash247", "blackseagrain", "baltic"]):
-        return "shipping"
+    hit = ET_DIRECT.get(et)
+    if hit:
+        return hit  # pas besoin de l'URL
 
-    return "other"
+    url = (_safe_get(row, "url", "") or "").lower()
+    return classify_theme(et, url)
 
 
 def compute_macro_score(macro_rows: List[Dict[str, Any]]) -> Dict[str, int]:
@@ -60,35 +43,17 @@ def compute_macro_score(macro_rows: List[Dict[str, Any]]) -> Dict[str, int]:
         "other": int,
       }
     """
-    weather_score = 0
-    fx_score = 0
-    energy_score = 0
-    shipping_score = 0
-    other_score = 0
-
-    for r in macro_rows:
-        theme = classify_macro_theme(r)
-        sent = _sentiment_score(_safe_get(r, "sentiment", "neutral"))
-
-        if theme == "weather":
-            weather_score += sent
-        elif theme == "fx":
-            fx_score += sent
-        elif theme == "energy":
-            energy_score += sent
-        elif theme == "shipping":
-            shipping_score += sent
-        else:
-            other_score += sent
-
-    final = weather_score + fx_score + energy_score + shipping_score + other_score
+    n = len(macro_rows)
+    themes = np.fromiter(
+        (_THEME_IDX[classify_macro_theme(r)] for r in macro_rows), dtype=np.int8, count=n
+    )
+    sents = np.fromiter(
+        (SENT_MAP.get(r.get("sentiment") or "", 0) for r in macro_rows), dtype=np.int8, count=n
+    )
+    sums = np.bincount(themes, weights=sents, minlength=len(MACRO_THEMES))
+    scores = {t: int(v) for t, v in zip(MACRO_THEMES, sums)}
+
+    final = sum(scores.values())
     final = max(-5, min(5, final))  # clamp entre -5 et +5
 
-    return {
-        "final_macro_score": final,
-        "weather": weather_score,
-        "fx": fx_score,
-        "energy": energy_score,
-        "shipping": shipping_score,
-        "other": other_score,
-    }
\ No newline at end of file
+    return {"final_macro_score": final, **scores}
@@ -1,21 +1,76 @@
+import os
 import requests
 import feedparser
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import yaml
-
-with open("configs/sources.yaml", encoding="utf-8") as f:
-  cfg = yaml.safe_load(f)
-
-all_sources = []
-for group_name, group_sources in cfg["sources"].items():
-    for s in group_sources:
-        s["group"] = group_name  # grains / macro / fx / energy / shipping / geopolitics
-        all_sources.append(s)
-        
-def fetch_html(url: str) -> dict | None:
+from requests.adapters import HTTPAdapter
+from lxml import etree
+
+from src.utils import load_yaml
+
+try:
+    import requests_cache
+except ImportError:  # requests-cache absent -> pas de cache HTTP disque
+    requests_cache = None
+
+FETCH_WORKERS = 32  # téléchargements simultanés
+USER_AGENT = "Mozilla/5.0 (compatible; grain_news_ai/1.0)"
+
+# Cache HTTP disque (ETag / Last-Modified -> GET conditionnel, 304 = hit)
+SCRAPE_CACHE_PATH = "data/cache/scrape"
+SCRAPE_CACHE_EXPIRE = 1800  # secondes
+
+# Une source de sources.yaml (immuable, partageable entre modules)
+Source = namedtuple("Source", "type url group name")
+
+
+def sources_from_config(cfg: dict, only_groups: set[str] | None = None) -> tuple:
+    """
+    Aplati cfg["sources"] (grains / macro / fx / energy / shipping / geopolitics)
+    en un tuple de Source. Si `only_groups` est donné, les autres groupes sont ignorés.
+    """
+    return tuple(
+        Source(s["type"], s["url"], group_name, s.get("name", ""))
+        for group_name, group_sources in cfg["sources"].items()
+        if only_groups is None or group_name in only_groups
+        for s in group_sources or ()
+    )
+
+
+all_sources = sources_from_config(load_yaml("configs/sources.yaml"))
+
+
+def make_session(pool_size: int = FETCH_WORKERS) -> requests.Session:
+    """
+    Session HTTP partagée : connexions keep-alive réutilisées,
+    un seul User-Agent, réponses compressées.
+    Avec requests-cache : réponses gardées sur disque et revalidées
+    par GET conditionnel d'un run à l'autre.
+    """
+    if requests_cache is not None:
+        os.makedirs(os.path.dirname(SCRAPE_CACHE_PATH), exist_ok=True)
+        session = requests_cache.CachedSession(
+            SCRAPE_CACHE_PATH,
+            expire_after=SCRAPE_CACHE_EXPIRE,
+            cache_control=True,
+        )
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+
+def fetch_html(url: str, session: requests.Session | None = None) -> dict | None:
     try:
         # timeout réduit à 8 secondes
-        r = requests.get(url, timeout=8)
+        r = (session or requests).get(url, timeout=8)
         r.raise_for_status()
     except requests.RequestException as e:
         print(f"[WARN] Failed to fetch {url} -> {e}")
@@ -28,24 +83,146 @@ def fetch_html(url: str) -> dict | None:
         "type": "html"
     }
 
-def fetch_rss(url: str) -> list:
-    feed = feedparser.parse(url)
+def _rss_entry(item: dict) -> dict:
+    return {
+        "url": item.link,
+        "title": item.title,
+        "summary": item.get("summary", ""),
+        "published": item.get("published", None),
+        "type": "rss",
+    }
+
+
+# Namespaces des flux : RSS 2.0 n'en a pas ; les autres sont nommés
+# explicitement (un "{*}" attraperait aussi media:title, dc:description...)
+_RSS1 = "{http://purl.org/rss/1.0/}"
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ATOM03 = "{http://purl.org/atom/ns#}"
+_CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+
+_ITEM_TAGS = ("item", _RSS1 + "item", _ATOM + "entry", _ATOM03 + "entry")
+_LINK_TAGS = frozenset(("link", _RSS1 + "link", _ATOM + "link", _ATOM03 + "link"))
+_TITLE_TAGS = ("title", _RSS1 + "title", _ATOM + "title", _ATOM03 + "title")
+_SUMMARY_TAGS = (
+    "description", _RSS1 + "description",
+    _ATOM + "summary", _ATOM03 + "summary",
+    _ATOM + "content", _ATOM03 + "content",
+    _CONTENT + "encoded",
+)
+_PUBLISHED_TAGS = ("pubDate", _ATOM + "published", _ATOM03 + "issued")
+
+
+def _child_text(item, tags: tuple) -> str | None:
+    """Texte du premier sous-élément non vide trouvé parmi `tags`."""
+    for tag in tags:
+        el = item.find(tag)
+        if el is None:
+            continue
+        # Atom type="xhtml" : le texte est dans des sous-éléments (<div>...)
+        text = "".join(el.itertext()) if el.get("type") == "xhtml" else el.text
+        if text and text.strip():
+            return text.strip()
+    return None
+
+
+def _item_link(item) -> str:
+    # RSS : <link>url</link> ; Atom : <link rel="alternate" href="url"/>
+    for el in item:
+        if el.tag not in _LINK_TAGS:
+            continue
+        if el.text and el.text.strip():
+            return el.text.strip()
+        if el.get("href") and el.get("rel", "alternate") == "alternate":
+            return el.get("href")
+    # RSS sans <link> : <guid> fait office de lien s'il est un permalien
+    # (isPermaLink absent = "true")
+    guid = item.find("guid")
+    if guid is not None and guid.text and guid.text.strip():
+        if guid.get("isPermaLink", "true").lower() == "true":
+            return guid.text.strip()
+    return ""
+
+
+def _parse_feed_lxml(content: bytes) -> list:
+    """
+    Extraction directe des <item> (RSS) / <entry> (Atom) avec lxml.
+    Lève etree.XMLSyntaxError si le flux n'est pas du XML valide.
+    """
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    root = etree.fromstring(content, parser)
+
     entries = []
-    for item in feed.entries:
+    for item in root.iter(*_ITEM_TAGS):
         entries.append({
-            "url": item.link,
-            "title": item.title,
-            "summary": item.get("summary", ""),
-            "published": item.get("published", None),
+            "url": _item_link(item),
+            "title": _child_text(item, _TITLE_TAGS) or "",
+            "summary": _child_text(item, _SUMMARY_TAGS) or "",
+            "published": _child_text(item, _PUBLISHED_TAGS),
             "type": "rss",
         })
     return entries
 
-def fetch_source(source_cfg: dict):
-    if source_cfg["type"] == "html":
-        item = fetch_html(source_cfg["url"])
+
+def fetch_rss_fast(url: str, session: requests.Session) -> list:
+    """
+    Télécharge le flux via la session (pool + cache) et le parse avec lxml.
+    feedparser ne sert que de repli pour les flux non conformes.
+    """
+    try:
+        r = session.get(url, timeout=8)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        print(f"[WARN] Failed to fetch {url} -> {e}")
+        return []
+
+    try:
+        return _parse_feed_lxml(r.content)
+    except etree.XMLSyntaxError:
+        feed = feedparser.parse(
+            r.content,
+            response_headers={
+                "content-location": url,
+                "content-type": r.headers.get("Content-Type", ""),
+            },
+        )
+        return [_rss_entry(item) for item in feed.entries]
+
+
+def fetch_rss(url: str, session: requests.Session | None = None) -> list:
+    if session is not None:
+        return fetch_rss_fast(url, session)
+
+    # feedparser fait lui-même la requête HTTP
+    feed = feedparser.parse(url, agent=USER_AGENT)
+    return [_rss_entry(item) for item in feed.entries]
+
+def fetch_source(source: Source, session: requests.Session | None = None):
+    if source.type == "html":
+        item = fetch_html(source.url, session)
         return [item] if item is not None else []
-    elif source_cfg["type"] == "rss":
-        return fetch_rss(source_cfg["url"])
+    elif source.type == "rss":
+        return fetch_rss(source.url, session)
     else:
-        raise ValueError(f"Unknown source type: {source_cfg['type']}")
\ No newline at end of file
+        raise ValueError(f"Unknown source type: {source.type}")
+
+
+def fetch_all(sources: list[Source], max_workers: int = FETCH_WORKERS) -> list[list]:
+    """
+    Télécharge toutes les sources en parallèle (I/O réseau -> threads),
+    avec une session HTTP partagée.
+    Retourne une liste d'items bruts par source, dans l'ordre de `sources`.
+    """
+    if not sources:
+        return []
+
+    session = make_session(max_workers)
+
+    def _fetch(src: Source) -> list:
+        print(f"[INFO] Fetching: {src.name}")
+        return fetch_source(src, session)
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sources))) as pool:
+            return list(pool.map(_fetch, sources))
+    finally:
+        session.close()
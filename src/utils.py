@@ -0,0 +1,79 @@
+# src/utils.py
+from __future__ import annotations
+import sys
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple
+
+import yaml
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick absent -> boucle simple sur les mots-clés
+    ahocorasick = None
+
+# Loader C (libyaml) si disponible, sinon loader Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# ---------- Accès aux lignes ----------
+
+def safe_get(row: dict, key: str, default: Any = "") -> Any:
+    """row[key], ou `default` si la clé est absente ou vaut None."""
+    v = row.get(key)
+    return v if v is not None else default
+
+
+# ---------- Config YAML ----------
+
+@lru_cache(maxsize=None)
+def load_yaml(yaml_path: str) -> dict:
+    """
+    Parse un fichier YAML une seule fois par chemin (résultat partagé :
+    ne pas le modifier).
+    """
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+# ---------- Classement par mots-clés (URL, etc.) ----------
+
+def build_matcher(groups: Sequence[Tuple[str, Sequence[str]]]):
+    """
+    Prépare un classifieur "premier groupe qui matche".
+    `groups` = [(label, [mots-clés...]), ...] par priorité décroissante ;
+    les mots-clés sont cherchés comme sous-chaînes (déjà en minuscules).
+    Un seul automate Aho-Corasick pour tous les groupes : un passage sur le texte.
+    """
+    groups = tuple((label, tuple(sys.intern(kw) for kw in kws)) for label, kws in groups)
+    if ahocorasick is None:
+        return None, groups
+
+    automaton = ahocorasick.Automaton()
+    for priority, (label, kws) in enumerate(groups):
+        for kw in kws:
+            # mot-clé présent dans plusieurs groupes -> le plus prioritaire gagne
+            if kw not in automaton:
+                automaton.add_word(kw, (priority, label))
+    automaton.make_automaton()
+    return automaton, groups
+
+
+def first_match(matcher, text: str) -> Optional[str]:
+    """
+    Label du groupe le plus prioritaire dont un mot-clé apparaît dans `text`,
+    None si aucun.
+    """
+    automaton, groups = matcher
+    if automaton is None:
+        for label, kws in groups:
+            if any(kw in text for kw in kws):
+                return label
+        return None
+
+    best = None
+    for _, hit in automaton.iter(text):
+        if best is None or hit[0] < best[0]:
+            best = hit
+            if best[0] == 0:
+                break
+    return best[1] if best is not None else None
@@ -0,0 +1,23 @@
+# tests/test_alerts.py
+import pytest
+
+import src.alerts as alerts
+
+
+def _fallback(monkeypatch, full):
+    monkeypatch.setattr(alerts, "_AUTOMATON", None)
+    return alerts._match_risk_keywords(full)
+
+
+def test_fallback_keywords_in_text_order(monkeypatch):
+    full = "embargo then a strike on port, export ban and drought"
+    assert [kw for kw, _ in _fallback(monkeypatch, full)] == [
+        "embargo", "strike", "strike on port", "export ban", "drought",
+    ]
+
+
+@pytest.mark.skipif(alerts._AUTOMATON is None, reason="pyahocorasick absent")
+def test_fallback_matches_automaton(monkeypatch):
+    full = "grain corridor blockade; port closure after missile attack, sanctions, quota"
+    expected = alerts._match_risk_keywords(full)
+    assert _fallback(monkeypatch, full) == expected
@@ -0,0 +1,83 @@
+# tests/test_price_impact.py
+"""
+Parité avec la version d'origine (boucles Python) de compute_price_impact.
+Les résultats attendus (tests/data/price_impact_baseline.json) ont été
+produits par le code d'origine sur les mêmes entrées générées par seed.
+"""
+import json
+import os
+import random
+
+import pytest
+
+from src.price_impact import compute_price_impact
+
+_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "data", "price_impact_baseline.json")
+
+_EVENT_TYPES = ["weather", "stocks", "production", "trade", "politics", "logistics",
+                "other", "Weather", "", None, "unknown"]
+_SENTIMENTS = ["bullish", "bearish", "neutral", "Bullish", "BEARISH", "", None, "mixed"]
+_URLS = ["https://www.usda.gov/a", "https://fao.org/x", "https://agmanager.info/y",
+         "https://foo.gov/z", "https://blog.example.com/p", "", None,
+         "https://news.agrofy.com.ar/n"]
+_SEVERITIES = ["critical", "watch", "none", "info", "", None, "CRITICAL"]
+_COMMODITIES = ["wheat", "corn", "soy", "Wheat", "other", "", None, "SOY"]
+
+
+def _gen(seed: int):
+    """Lot d'articles + score macro aléatoires, déterministes pour un seed."""
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(rnd.randint(1, 60)):
+        rows.append({
+            "commodity": rnd.choice(_COMMODITIES),
+            "event_type": rnd.choice(_EVENT_TYPES),
+            "sentiment": rnd.choice(_SENTIMENTS),
+            "analysis": "a" * rnd.choice([0, 50, 119, 120, 200, 349, 350, 400]),
+            "summary": "s" * rnd.choice([0, 100, 400]),
+            "url": rnd.choice(_URLS),
+            "alert_severity": rnd.choice(_SEVERITIES),
+        })
+    macro = {
+        "final_macro_score": rnd.randint(-5, 5),
+        "fx": rnd.randint(-3, 3),
+        "energy": rnd.randint(-3, 3),
+        "weather": rnd.randint(-3, 3),
+        "shipping": rnd.randint(-3, 3),
+    }
+    return rows, macro
+
+
+with open(_BASELINE_PATH, "r", encoding="utf-8") as f:
+    _BASELINE = json.load(f)
+
+
+@pytest.mark.parametrize("seed", sorted(_BASELINE, key=int))
+def test_matches_baseline(seed):
+    rows, macro = _gen(int(seed))
+    result = compute_price_impact(rows, macro)
+    assert list(result) == list(_BASELINE[seed])
+    assert result == _BASELINE[seed]
+
+
+def test_near_threshold_sums_in_article_order():
+    # somme par paires : |total_ct| passe sous 0.15 -> "neutre" à tort
+    spec = [
+        ("other", "bullish", 400), ("production", "bullish", 200),
+        ("logistics", "bearish", 200), ("stocks", "neutral", 400),
+        ("politics", "bearish", 400), ("trade", "bearish", 400),
+        ("logistics", "bullish", 400), ("stocks", "bullish", 50),
+        ("politics", "bearish", 200),
+    ]
+    rows = [
+        {"commodity": "wheat", "event_type": et, "sentiment": s, "analysis": "x" * n}
+        for et, s, n in spec
+    ]
+    assert compute_price_impact(rows, {"final_macro_score": 0}) == {
+        "wheat": {"ct_low": 0.2, "ct_high": 0.2, "mt_low": 0.0, "mt_high": 0.0,
+                  "confidence": 0.38},
+    }
+
+
+def test_empty():
+    assert compute_price_impact([], {"final_macro_score": 0}) == {}
@@ -0,0 +1,51 @@
+# tests/test_scraping.py
+"""Extraction lxml des flux RSS / Atom (sans réseau)."""
+from src.scraping import _parse_feed_lxml
+
+
+def test_mrss_uses_item_title_not_media_title():
+    feed = b"""<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>
+    <item>
+      <media:title>MT</media:title>
+      <media:description>MD</media:description>
+      <title>Wheat &amp; corn</title>
+      <link>http://x/1</link>
+      <description>Prices up</description>
+    </item>
+    </channel></rss>"""
+    [entry] = _parse_feed_lxml(feed)
+    assert entry["title"] == "Wheat & corn"
+    assert entry["summary"] == "Prices up"
+    assert entry["url"] == "http://x/1"
+
+
+def test_atom_xhtml_content():
+    feed = b"""<feed xmlns="http://www.w3.org/2005/Atom">
+    <entry>
+      <title>Corn</title>
+      <link href="http://x/2"/>
+      <published>2024-01-02T00:00:00Z</published>
+      <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Corn <b>rallies</b></p></div></content>
+    </entry>
+    </feed>"""
+    [entry] = _parse_feed_lxml(feed)
+    assert entry["summary"] == "Corn rallies"
+    assert entry["url"] == "http://x/2"
+    assert entry["published"] == "2024-01-02T00:00:00Z"
+
+
+def test_rss_guid_link_and_content_encoded():
+    feed = b"""<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>
+    <item>
+      <title>A</title>
+      <guid isPermaLink="true">http://x/a</guid>
+      <content:encoded><![CDATA[<p>enc</p>]]></content:encoded>
+    </item>
+    <item>
+      <title>B</title>
+      <guid isPermaLink="false">id-b</guid>
+    </item>
+    </channel></rss>"""
+    a, b = _parse_feed_lxml(feed)
+    assert (a["url"], a["summary"]) == ("http://x/a", "<p>enc</p>")
+    assert b["url"] == ""